@@ -0,0 +1,60 @@
+# Copyright 2025 Google LLC.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Path classification used by the request middleware in main.py.
+
+Public prefixes and asset extensions bypass the budget guard. They are compiled
+once into a single regex so the per-request check is one match instead of a
+Python loop, while matching exactly what `startswith`/`lower().endswith` did.
+"""
+
+import re
+
+# Static assets never reach Mesop, so they need no session id.
+STATIC_PREFIXES = (
+    "/favicon.ico",
+    "/static",
+    "/assets",
+    "/__web-components-module__",
+    "/.well-known",
+)
+PUBLIC_PREFIXES = STATIC_PREFIXES + (
+    "/__ui__",
+    "/api/",
+    "/auth/",
+    "/setup_profile",
+    "/access_restricted",
+)
+ASSET_EXTS = (
+    "js", "mjs", "css", "map", "json", "png", "jpg", "jpeg", "gif", "svg", "ico",
+    "woff", "woff2", "ttf", "eot", "wasm", "webp", "mp4", "webm",
+)
+
+# \Z rather than $: $ also matches before a trailing newline, and request paths
+# are already percent-decoded, so "/x.json%0A" would otherwise look like an asset.
+# ASCII-only case folding keeps non-ASCII look-alikes (e.g. "ſ" for "s") out.
+_ASSET_EXT_PATTERN = r"|(?ai:\.(?:" + "|".join(ASSET_EXTS) + r"))\Z"
+BYPASS_RE = re.compile("^(?:" + "|".join(map(re.escape, PUBLIC_PREFIXES)) + ")" + _ASSET_EXT_PATTERN)
+STATIC_RE = re.compile("^(?:" + "|".join(map(re.escape, STATIC_PREFIXES)) + ")" + _ASSET_EXT_PATTERN)
+
+
+def is_bypass_path(path: str) -> bool:
+    """Whether the budget guard should skip this path (public prefix or asset)."""
+    return BYPASS_RE.search(path) is not None
+
+
+def is_static_path(path: str) -> bool:
+    """Whether this path is a static asset that needs no session id."""
+    return STATIC_RE.search(path) is not None
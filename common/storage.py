@@ -21,6 +21,7 @@ from google.cloud import aiplatform
 from google.cloud import storage
 import vertexai
 
+from config import gcp_clients
 from config.default import Default
 from config.firebase_config import FirebaseClient
 
@@ -76,7 +77,7 @@ def store_to_gcs(
     print(
         f"store_to_gcs: Target project {cfg.PROJECT_ID}, target bucket {actual_bucket_name}"
     )
-    client = storage.Client(project=cfg.PROJECT_ID)
+    client = gcp_clients.STORAGE
     bucket = client.get_bucket(actual_bucket_name)
     destination_blob_name = f"{folder}/{file_name}"
     print(f"store_to_gcs: Destination {destination_blob_name}")
@@ -95,21 +96,21 @@ def store_to_gcs(
 
 def download_from_gcs(gcs_uri: str) -> bytes:
     """Downloads a file from a GCS URI and returns its content as bytes."""
-    client = storage.Client(project=cfg.PROJECT_ID)
+    client = gcp_clients.STORAGE
     blob = storage.Blob.from_string(gcs_uri, client=client)
     return blob.download_as_bytes()
 
 
 def download_from_gcs_as_string(gcs_uri: str):
     """Downloads a file from a GCS URI and returns its content as a string."""
-    client = storage.Client(project=cfg.PROJECT_ID)
+    client = gcp_clients.STORAGE
     blob = storage.Blob.from_string(gcs_uri, client=client)
     return blob.download_as_string()
 
 
 def list_files_in_bucket(bucket_name, prefix=None):
     """Lists all blobs (files) in the specified GCS bucket, optionally filtered by a prefix."""
-    client = storage.Client(project=cfg.PROJECT_ID)
+    client = gcp_clients.STORAGE
     bucket = client.get_bucket(bucket_name)
 
     # List blobs, optionally with a prefix to emulate a "folder"
@@ -185,6 +185,14 @@ class Default:
     BILLING_PROJECT_ID: Optional[str] = os.environ.get("BILLING_PROJECT_ID")
     BILLING_DATASET: Optional[str] = os.environ.get("BILLING_DATASET")
     BILLING_TABLE: Optional[str] = os.environ.get("BILLING_TABLE")
+    # Dataset location of the billing export (e.g. "US", "EU"); skips location autodetection
+    BILLING_LOCATION: Optional[str] = os.environ.get("BILLING_LOCATION") or None
+    # Optional cap on bytes billed per cost query; the query fails (cost unavailable) if exceeded
+    BILLING_MAX_BYTES_BILLED: Optional[int] = (
+        int(os.environ["BILLING_MAX_BYTES_BILLED"]) if os.environ.get("BILLING_MAX_BYTES_BILLED") else None
+    )
+    # Seconds to reuse a monthly cost result before querying BigQuery again
+    BUDGET_COST_CACHE_TTL: int = int(os.environ.get("BUDGET_COST_CACHE_TTL", 300))
 
     # Budget Firestore database and collections
     BUDGET_DB_ID: str = os.environ.get(
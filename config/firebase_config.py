@@ -12,47 +12,61 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import threading
 from typing import Optional, Dict
-import os
-import firebase_admin
-from firebase_admin import credentials, firestore
-from config.default import Default
+from google.cloud.firestore import AsyncClient, Client  # type: ignore
+from config import gcp_clients
 
 
 class FirebaseClient:
     """Firestore client manager supporting multiple database IDs.
 
     This avoids binding the entire process to the first database requested.
-    It caches a client per database_id and initializes firebase_admin once.
+    It caches a google.cloud.firestore.Client per database_id, built with the
+    process-wide credentials from config.gcp_clients.
     """
 
-    _app_initialized: bool = False
-    _clients: Dict[str, firestore.Client] = {}
+    _clients: Dict[str, Client] = {}
+    _lock = threading.Lock()
 
     def __init__(self, database_id: Optional[str] = None):
         # Default Firestore database id when not provided
         self._database_id = database_id or "(default)"
-        if not FirebaseClient._app_initialized:
-            try:
-                # Ensure project id is available to google.auth.default to avoid gcloud subprocess calls
-                project_id = Default().PROJECT_ID
-                if project_id:
-                    os.environ.setdefault("GOOGLE_CLOUD_PROJECT", project_id)
-                    os.environ.setdefault("GCP_PROJECT", project_id)
-                cred = credentials.ApplicationDefault()
-                # Initialize with explicit project to avoid ADC project drift.
-                firebase_admin.initialize_app(cred, {"projectId": project_id})
-            except ValueError:
-                # Already initialized elsewhere
-                pass
-            FirebaseClient._app_initialized = True
-
-    def get_client(self) -> firestore.Client:
+
+    def get_client(self) -> Client:
         # Return cached client or create a new one for this database id
         db_id = self._database_id
         client = FirebaseClient._clients.get(db_id)
         if client is None:
-            # Use database_id for the installed firebase_admin version and rely on initialize_app(projectId=...).
-            client = firestore.client(database_id=db_id)
-            FirebaseClient._clients[db_id] = client
+            # Double-checked so concurrent first callers share one client (and channel)
+            with FirebaseClient._lock:
+                client = FirebaseClient._clients.get(db_id)
+                if client is None:
+                    client = Client(project=gcp_clients.PROJECT, database=db_id, credentials=gcp_clients.CREDS)
+                    FirebaseClient._clients[db_id] = client
+        return client
+
+
+class AsyncFirebaseClient:
+    """Async Firestore client manager for code running on the event loop.
+
+    Caches one google.cloud.firestore.AsyncClient per database_id so awaiting
+    reads from async handlers does not block other requests.
+    """
+
+    _clients: Dict[str, AsyncClient] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, database_id: Optional[str] = None):
+        self._database_id = database_id or "(default)"
+
+    def get_client(self) -> AsyncClient:
+        db_id = self._database_id
+        client = AsyncFirebaseClient._clients.get(db_id)
+        if client is None:
+            with AsyncFirebaseClient._lock:
+                client = AsyncFirebaseClient._clients.get(db_id)
+                if client is None:
+                    client = AsyncClient(project=gcp_clients.PROJECT, database=db_id, credentials=gcp_clients.CREDS)
+                    AsyncFirebaseClient._clients[db_id] = client
         return client
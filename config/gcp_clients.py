@@ -0,0 +1,46 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Process-wide Google Cloud credentials and clients.
+
+Application Default Credentials are resolved once at import and passed
+explicitly to client constructors, so individual clients do not repeat ADC
+discovery (which can shell out to gcloud in local environments).
+"""
+
+import os
+from functools import lru_cache
+from typing import Optional
+
+import google.auth
+from google.cloud import bigquery, storage
+
+from config.default import Default
+
+_project_id = Default().PROJECT_ID
+if _project_id:
+    # Ensure project id is available to google.auth.default to avoid gcloud subprocess calls
+    os.environ.setdefault("GOOGLE_CLOUD_PROJECT", _project_id)
+    os.environ.setdefault("GCP_PROJECT", _project_id)
+
+CREDS, _adc_project = google.auth.default()
+PROJECT: Optional[str] = _project_id or _adc_project
+
+STORAGE = storage.Client(credentials=CREDS, project=PROJECT)
+
+
+@lru_cache(maxsize=None)
+def bigquery_client(project: Optional[str] = None) -> bigquery.Client:
+    """Returns a cached BigQuery client for `project` (defaults to PROJECT)."""
+    return bigquery.Client(credentials=CREDS, project=project or PROJECT)
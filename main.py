@@ -13,29 +13,35 @@
 # limitations under the License.
 """Main Mesop App."""
 
+import asyncio
 import datetime
 import inspect
+import mimetypes
 import os
-import uuid
+import secrets
+import time
+from urllib.parse import quote
 
-import google.auth
 import mesop as me
 from fastapi import APIRouter, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.middleware.wsgi import WSGIMiddleware
-from fastapi.responses import FileResponse, RedirectResponse, StreamingResponse, JSONResponse
+from fastapi.responses import FileResponse, RedirectResponse, Response, StreamingResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
+from google.api_core.exceptions import NotFound
 from google.auth import impersonated_credentials
-from google.cloud import storage
+from google.cloud.storage._signing import generate_signed_url_v4
 from pydantic import BaseModel
 
 import pages.shop_the_look
 from app_factory import app
 from common.prompt_template_service import PromptTemplate
+from common.request_paths import is_bypass_path, is_static_path
 from common.utils import create_display_url
 from routers import veo_router
 from config import default as config
+from config import gcp_clients
 from models.video_processing import convert_mp4_to_gif
 from pages import about as about_page
 from pages import setup_profile as setup_profile_page  # noqa: F401 - register page
@@ -96,10 +102,19 @@ app.include_router(router)
 # Block manual navigation to onboarding/budget pages
 
 
+# Read once at import, relative to this file so the working directory does not matter,
+# and served directly instead of redirecting to /assets.
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "favicon.ico"), "rb") as _f:
+    _FAVICON = _f.read()
+
+
 @app.get("/favicon.ico", include_in_schema=False)
 async def favicon():
-    # Redirect to the mounted static assets to avoid file path issues in some environments
-    return RedirectResponse(url="/assets/favicon.ico", status_code=307)
+    return Response(
+        content=_FAVICON,
+        media_type="image/x-icon",
+        headers={"Cache-Control": "public, max-age=86400"},
+    )
 
 
 @app.exception_handler(Exception)
@@ -118,7 +133,7 @@ app.add_middleware(
 )
 
 
-@app.get("/api/convert_to_gif")
+@app.get("/api/convert_to_gif", response_model=None)
 def convert_to_gif(gcs_uri: str, request: Request):
     """Converts an MP4 video to a GIF and saves it to GCS."""
     try:
@@ -128,31 +143,33 @@ def convert_to_gif(gcs_uri: str, request: Request):
     except Exception as e:
         error_message = str(e)
         print(f"Error generating GIF: {error_message}")
-        return {"error": error_message}, 500
+        return JSONResponse(status_code=500, content={"error": error_message})
+
+
+# Built once and reused: google-auth mints and refreshes the impersonated token
+# on demand, so requests do not each pay for a new IAM token exchange.
+_SIGNING_CREDS = impersonated_credentials.Credentials(
+    source_credentials=gcp_clients.CREDS,
+    target_principal=config.Default.SERVICE_ACCOUNT_EMAIL,
+    target_scopes=["https://www.googleapis.com/auth/devstorage.read_only"],
+    lifetime=3600,
+)
 
 
-@app.get("/api/get_signed_url")
+@app.get("/api/get_signed_url", response_model=None)
 def get_signed_url(gcs_uri: str):
     """Generates a signed URL for a GCS object."""
     try:
-        credentials, _ = google.auth.default()
-
-        signing_credentials = impersonated_credentials.Credentials(
-            source_credentials=credentials,
-            target_principal=config.Default.SERVICE_ACCOUNT_EMAIL,
-            target_scopes="https://www.googleapis.com/auth/devstorage.read_only",
-        )
-
-        storage_client = storage.Client()
         bucket_name, blob_name = gcs_uri.replace("gs://", "").split("/", 1)
-        bucket = storage_client.bucket(bucket_name)
-        blob = bucket.blob(blob_name)
 
-        signed_url = blob.generate_signed_url(
-            version="v4",
+        # Sign directly rather than through Bucket/Blob wrappers; the resource
+        # path is quoted the same way Blob.generate_signed_url does it.
+        signed_url = generate_signed_url_v4(
+            credentials=_SIGNING_CREDS,
+            resource=f"/{bucket_name}/{quote(blob_name, safe=b'/~')}",
             expiration=datetime.timedelta(minutes=15),
+            api_access_endpoint="https://storage.googleapis.com",
             method="GET",
-            credentials=signing_credentials,
         )
 
         return {"signed_url": signed_url}
@@ -165,7 +182,7 @@ def get_signed_url(gcs_uri: str):
                 "Please ensure you have authenticated with service account impersonation by running: "
                 "gcloud auth application-default login --impersonate-service-account=<YOUR_SERVICE_ACCOUNT_EMAIL>"
             )
-        return {"error": error_message}, 500
+        return JSONResponse(status_code=500, content={"error": error_message})
 
 
 @app.middleware("http")
@@ -184,47 +201,126 @@ async def add_global_csp(request: Request, call_next):
     return response
 
 
+async def _refresh_budget_snapshot():
+    """Periodically reloads the budget snapshot read by the request guard."""
+    last_cost_refresh = float("-inf")
+    while True:
+        include_cost = time.monotonic() - last_cost_refresh >= config.Default.BUDGET_COST_CACHE_TTL
+        try:
+            await asyncio.to_thread(budget_service.refresh_snapshot, include_cost)
+            if include_cost:
+                last_cost_refresh = time.monotonic()
+        except Exception as ex:  # keep refreshing; the guard falls back to direct lookups
+            logging.warning("[budget] snapshot_refresh_failed error=%s", ex)
+        await asyncio.sleep(budget_service.SNAPSHOT_REFRESH_SECONDS)
+
+
+_budget_refresher_task: asyncio.Task | None = None
+
+
+@app.on_event("startup")
+async def start_budget_snapshot_refresher():
+    global _budget_refresher_task
+    if not budget_service.snapshot_needed():
+        # Project scope with budget checks disabled: the guard does no budget I/O
+        return
+    try:
+        await asyncio.to_thread(budget_service.start_snapshot_listeners)
+    except Exception as ex:  # polling in the refresher still covers users/budgets
+        logging.warning("[budget] snapshot_listeners_unavailable error=%s", ex)
+    _budget_refresher_task = asyncio.create_task(_refresh_budget_snapshot())
+
+
+@app.on_event("shutdown")
+async def stop_budget_snapshot_refresher():
+    if _budget_refresher_task is not None:
+        _budget_refresher_task.cancel()
+    budget_service.stop_snapshot_listeners()
+
+
+async def require_budget(request: Request) -> RedirectResponse | None:
+    """Enforces onboarding and budget access for a protected route.
+
+    Expects set_request_context to have stored the user in the ASGI scope.
+    Returns a redirect when the user must complete their profile or is blocked
+    by the budget, otherwise None.
+    """
+    path = request.url.path or "/"
+    user_email = request.scope["MESOP_USER_EMAIL"]
+    # Branch by budget scope
+    scope = config.Default.BUDGET_SCOPE
+    if scope == "project":
+        # In project mode, skip profile setup and use a single project budget key
+        if config.Default.BUDGET_CHECK_ENABLED:
+            try:
+                project_budget, monthly_cost = await asyncio.gather(
+                    budget_service.snapshot_department_budget(config.Default.BUDGET_PROJECT_KEY),
+                    budget_service.snapshot_monthly_cloud_cost(),
+                )
+                if project_budget is None:
+                    logging.info("[budget] missing_project_budget path=%s user=%s key=%s", path, user_email, config.Default.BUDGET_PROJECT_KEY)
+                    return RedirectResponse(url="/access_restricted", status_code=302)
+                if monthly_cost is None:
+                    logging.info(
+                        "[budget] cost_unavailable path=%s user=%s billing_project=%s dataset=%s table=%s",
+                        path, user_email, config.Default.BILLING_PROJECT_ID, config.Default.BILLING_DATASET, config.Default.BILLING_TABLE,
+                    )
+                    return RedirectResponse(url="/access_restricted", status_code=302)
+                if monthly_cost > float(project_budget):
+                    logging.info(
+                        "[budget] over_budget_project path=%s user=%s cost=%.2f budget=%.2f",
+                        path, user_email, monthly_cost, float(project_budget),
+                    )
+                    return RedirectResponse(url="/access_restricted", status_code=302)
+            except Exception as ex:
+                logging.exception("[budget] evaluation_failed_project path=%s user=%s error=%s", path, user_email, ex)
+                return RedirectResponse(url="/access_restricted", status_code=302)
+    else:
+        # Department mode: require user profile BEFORE any budget checks
+        try:
+            dept = await budget_service.snapshot_user_department(user_email)
+        except Exception as ex:
+            logging.exception("[guard] missing_department_error path=%s user=%s error=%s", path, user_email, ex)
+            return RedirectResponse(url="/setup_profile", status_code=302)
+        if not dept:
+            logging.info("[guard] missing_department path=%s user=%s", path, user_email)
+            return RedirectResponse(url="/setup_profile", status_code=302)
+
+        if config.Default.BUDGET_CHECK_ENABLED:
+            try:
+                dept_budget, monthly_cost = await asyncio.gather(
+                    budget_service.snapshot_department_budget(dept),
+                    budget_service.snapshot_monthly_cloud_cost(),
+                )
+                if dept_budget is None:
+                    logging.info("[budget] missing_budget path=%s user=%s dept=%s", path, user_email, dept)
+                    return RedirectResponse(url="/access_restricted", status_code=302)
+
+                # Require cost availability in all environments
+                if monthly_cost is None:
+                    logging.info(
+                        "[budget] cost_unavailable path=%s user=%s dept=%s billing_project=%s dataset=%s table=%s",
+                        path, user_email, dept, config.Default.BILLING_PROJECT_ID, config.Default.BILLING_DATASET, config.Default.BILLING_TABLE,
+                    )
+                    return RedirectResponse(url="/access_restricted", status_code=302)
+                if monthly_cost is not None and monthly_cost > float(dept_budget):
+                    logging.info(
+                        "[budget] over_budget path=%s user=%s dept=%s cost=%.2f budget=%.2f",
+                        path, user_email, dept, monthly_cost, float(dept_budget),
+                    )
+                    return RedirectResponse(url="/access_restricted", status_code=302)
+            except Exception as ex:  # defensive catch: never 500 on guard
+                logging.exception("[budget] evaluation_failed path=%s user=%s error=%s", path, user_email, ex)
+                return RedirectResponse(url="/access_restricted", status_code=302)
+    return None
+
+
 @app.middleware("http")
 async def set_request_context(request: Request, call_next):
-    """Sets user/session data and enforces budget access control before Mesop handles the route."""
+    """Sets user/session data and applies the budget guard before Mesop handles the route."""
     path = request.url.path or "/"
 
-    # Public prefixes and asset extensions should bypass budget checks
-    public_prefixes = (
-        "/favicon.ico",
-        "/static",
-        "/assets",
-        "/__web-components-module__",
-        "/__ui__",
-        "/.well-known",
-        "/api/",
-        "/auth/",
-        "/setup_profile",
-        "/access_restricted",
-    )
-    asset_exts = (
-        ".js",
-        ".mjs",
-        ".css",
-    ".map",
-    ".json",
-        ".png",
-        ".jpg",
-        ".jpeg",
-        ".gif",
-        ".svg",
-        ".ico",
-        ".woff",
-        ".woff2",
-        ".ttf",
-        ".eot",
-        ".wasm",
-        ".webp",
-        ".mp4",
-        ".webm",
-    )
-    is_public_prefix = any(path.startswith(p) for p in public_prefixes)
-    is_asset_request = any(path.lower().endswith(ext) for ext in asset_exts)
+    is_bypass = is_bypass_path(path)
 
     # Resolve identity from IAP header; use anonymous for local/dev
     user_email = request.headers.get("X-Goog-Authenticated-User-Email")
@@ -233,8 +329,11 @@ async def set_request_context(request: Request, call_next):
     if user_email.startswith("accounts.google.com:"):
         user_email = user_email.split(":")[-1]
 
-    # Get or create a session id
-    session_id = request.cookies.get("session_id") or str(uuid.uuid4())
+    # Get or create a session id; static assets neither need nor set one
+    session_id = request.cookies.get("session_id") or ""
+    new_session = not session_id and not is_static_path(path)
+    if new_session:
+        session_id = secrets.token_hex(16)
 
     # Stash in ASGI scope for Mesop/state
     request.scope["MESOP_USER_EMAIL"] = user_email
@@ -245,72 +344,15 @@ async def set_request_context(request: Request, call_next):
         request.scope["MESOP_GA_MEASUREMENT_ID"] = config.Default.GA_MEASUREMENT_ID
 
     # Enforce onboarding/budget for protected routes (skip assets/public)
-    if not (is_public_prefix or is_asset_request):
-        # Branch by budget scope
-        scope = config.Default.BUDGET_SCOPE
-        if scope == "project":
-            # In project mode, skip profile setup and use a single project budget key
-            if config.Default.BUDGET_CHECK_ENABLED:
-                try:
-                    project_budget = budget_service.get_project_budget()
-                    if project_budget is None:
-                        logging.info("[budget] missing_project_budget path=%s user=%s key=%s", path, user_email, config.Default.BUDGET_PROJECT_KEY)
-                        return RedirectResponse(url="/access_restricted", status_code=302)
-                    monthly_cost = budget_service.get_monthly_cloud_cost()
-                    if monthly_cost is None:
-                        logging.info(
-                            "[budget] cost_unavailable path=%s user=%s billing_project=%s dataset=%s table=%s",
-                            path, user_email, config.Default.BILLING_PROJECT_ID, config.Default.BILLING_DATASET, config.Default.BILLING_TABLE,
-                        )
-                        return RedirectResponse(url="/access_restricted", status_code=302)
-                    if monthly_cost > float(project_budget):
-                        logging.info(
-                            "[budget] over_budget_project path=%s user=%s cost=%.2f budget=%.2f",
-                            path, user_email, monthly_cost, float(project_budget),
-                        )
-                        return RedirectResponse(url="/access_restricted", status_code=302)
-                except Exception as ex:
-                    logging.exception("[budget] evaluation_failed_project path=%s user=%s error=%s", path, user_email, ex)
-                    return RedirectResponse(url="/access_restricted", status_code=302)
-        else:
-            # Department mode: require user profile BEFORE any budget checks
-            try:
-                dept = budget_service.get_user_department(user_email)
-            except Exception as ex:
-                logging.exception("[guard] missing_department_error path=%s user=%s error=%s", path, user_email, ex)
-                return RedirectResponse(url="/setup_profile", status_code=302)
-            if not dept:
-                logging.info("[guard] missing_department path=%s user=%s", path, user_email)
-                return RedirectResponse(url="/setup_profile", status_code=302)
-
-            if config.Default.BUDGET_CHECK_ENABLED:
-                try:
-                    dept_budget = budget_service.get_department_budget(dept)
-                    if dept_budget is None:
-                        logging.info("[budget] missing_budget path=%s user=%s dept=%s", path, user_email, dept)
-                        return RedirectResponse(url="/access_restricted", status_code=302)
-
-                    monthly_cost = budget_service.get_monthly_cloud_cost()
-                    # Require cost availability in all environments
-                    if monthly_cost is None:
-                        logging.info(
-                            "[budget] cost_unavailable path=%s user=%s dept=%s billing_project=%s dataset=%s table=%s",
-                            path, user_email, dept, config.Default.BILLING_PROJECT_ID, config.Default.BILLING_DATASET, config.Default.BILLING_TABLE,
-                        )
-                        return RedirectResponse(url="/access_restricted", status_code=302)
-                    if monthly_cost is not None and monthly_cost > float(dept_budget):
-                        logging.info(
-                            "[budget] over_budget path=%s user=%s dept=%s cost=%.2f budget=%.2f",
-                            path, user_email, dept, monthly_cost, float(dept_budget),
-                        )
-                        return RedirectResponse(url="/access_restricted", status_code=302)
-                except Exception as ex:  # defensive catch: never 500 on guard
-                    logging.exception("[budget] evaluation_failed path=%s user=%s error=%s", path, user_email, ex)
-                    return RedirectResponse(url="/access_restricted", status_code=302)
+    if not is_bypass:
+        redirect = await require_budget(request)
+        if redirect is not None:
+            return redirect
 
     # Continue request
     response = await call_next(request)
-    response.set_cookie(key="session_id", value=session_id, httponly=True, samesite="Lax")
+    if new_session:
+        response.set_cookie(key="session_id", value=session_id, httponly=True, samesite="Lax")
     return response
 
 
@@ -342,6 +384,9 @@ me.page(path="/test_async_veo", title="Test Async Veo")(test_async_veo_page)
 
 
 
+_MEDIA_CHUNK_SIZE = 256 * 1024
+
+
 # Add a new endpoint to proxy GCS media for better caching.
 @app.get("/media/{bucket_name}/{object_path:path}")
 async def get_media_proxy(request: Request, bucket_name: str, object_path: str):
@@ -357,26 +402,39 @@ async def get_media_proxy(request: Request, bucket_name: str, object_path: str):
         raise HTTPException(status_code=401, detail="Authentication required")
 
     try:
-        storage_client = storage.Client()
-        bucket = storage_client.bucket(bucket_name)
-        blob = bucket.blob(object_path)
-
-        if not blob.exists():
-            raise HTTPException(status_code=404, detail="Object not found")
+        blob = gcp_clients.STORAGE.bucket(bucket_name).blob(object_path)
+
+        # Open and read the first chunk eagerly: this is the only GCS round-trip
+        # before streaming, it raises NotFound for missing objects, and it fills
+        # in blob.content_type from the download response headers.
+        # Blocking GCS I/O runs in worker threads so the event loop stays free.
+        stream = blob.open("rb", chunk_size=_MEDIA_CHUNK_SIZE)
+        first_chunk = await asyncio.to_thread(stream.read, _MEDIA_CHUNK_SIZE)
+    except NotFound:
+        raise HTTPException(status_code=404, detail="Object not found")
+    except Exception as e:
+        print(f"Error proxying GCS object: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
 
-        blob.reload()
-        content_type = blob.content_type
+    content_type = (
+        blob.content_type
+        or mimetypes.guess_type(object_path)[0]
+        or "application/octet-stream"
+    )
 
-        # Set a cache header to instruct browsers and CDNs to cache for 1 hour.
-        headers = {"Cache-Control": "public, max-age=3600"}
+    async def _iter_chunks():
+        try:
+            yield first_chunk
+            while chunk := await asyncio.to_thread(stream.read, _MEDIA_CHUNK_SIZE):
+                yield chunk
+        finally:
+            stream.close()
 
-        # Stream the file content directly from GCS to the user.
-        stream = blob.open("rb")
-        return StreamingResponse(stream, media_type=content_type, headers=headers)
+    # Set a cache header to instruct browsers and CDNs to cache for 1 hour.
+    headers = {"Cache-Control": "public, max-age=3600"}
 
-    except Exception as e:
-        print(f"Error proxying GCS object: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error")
+    # Stream the file content directly from GCS to the user.
+    return StreamingResponse(_iter_chunks(), media_type=content_type, headers=headers)
 
 
 @app.get("/")
@@ -441,13 +499,19 @@ if __name__ == "__main__":
 
     host = os.environ.get("HOST", "0.0.0.0")
     port = int(os.environ.get("PORT", "8080"))
+    debug_mode = os.environ.get("DEBUG_MODE", "") == "true"
 
+    # The file watcher is dev-only; uvicorn ignores workers when reload is on.
+    # loop/http "auto" pick uvloop and httptools whenever they are installed.
     uvicorn.run(
         "main:app",
         host=host,
         port=port,
-        reload=True,
-        reload_includes=["*.py", "*.js"],
+        workers=1 if debug_mode else int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 2)),
+        loop="auto",
+        http="auto",
+        reload=debug_mode,
+        reload_includes=["*.py", "*.js"] if debug_mode else None,
         timeout_graceful_shutdown=0,
         proxy_headers=True,
     )
\ No newline at end of file
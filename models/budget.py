@@ -7,19 +7,80 @@ by FastAPI middleware and Mesop pages.
 
 from __future__ import annotations
 
+import asyncio
 import datetime
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Optional
 
+from cachetools import LRUCache, TTLCache  # type: ignore
+from google.api_core.exceptions import (  # type: ignore
+    DeadlineExceeded,
+    GoogleAPICallError,
+    RetryError,
+    ServiceUnavailable,
+)
+from google.auth.exceptions import GoogleAuthError  # type: ignore
 from google.cloud import bigquery  # type: ignore
 from google.cloud import firestore  # type: ignore
 
+from config import gcp_clients
 from config.default import Default
-from config.firebase_config import FirebaseClient
+from config.firebase_config import AsyncFirebaseClient, FirebaseClient
 
 
 cfg = Default()
 
+# Short-lived caches for the per-request guard lookups. Entries are invalidated on
+# writes from this process; other instances converge within the TTL.
+_LOOKUP_CACHE_TTL_SECONDS = 60
+_USER_DEPT_CACHE: TTLCache = TTLCache(maxsize=10_000, ttl=_LOOKUP_CACHE_TTL_SECONDS)
+_DEPT_BUDGET_CACHE: TTLCache = TTLCache(maxsize=10_000, ttl=_LOOKUP_CACHE_TTL_SECONDS)
+_USER_ROLE_CACHE: TTLCache = TTLCache(maxsize=10_000, ttl=_LOOKUP_CACHE_TTL_SECONDS)
+_CACHE_LOCK = threading.Lock()
+_MISSING = object()
+# Last department seen per email (no TTL, bounded LRU); used to guess which budget doc
+# to batch-read. Guarded by _CACHE_LOCK since LRU reads reorder entries.
+_LAST_KNOWN_DEPT: LRUCache = LRUCache(maxsize=10_000)
+
+# Runs independent blocking reads side by side for the sync helpers.
+_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="budget")
+
+# Monthly cost per target project: {project_id: (value, expires_at_monotonic)}.
+# A failed query is cached as None for _COST_FAILURE_TTL_SECONDS so callers queued
+# on the query lock do not each retry a failing BigQuery.
+_COST_CACHE: dict[str, tuple[Optional[float], float]] = {}
+_COST_FAILURE_TTL_SECONDS = 20
+_COST_CACHE_LOCK = threading.Lock()
+# One lock per target project, held across the query so only one caller refreshes.
+_COST_QUERY_LOCKS: dict[str, threading.Lock] = {}
+
+# In-memory view of the budget data used by the request guard. Users and budgets
+# are pushed by Firestore snapshot listeners once started (the "*_live" flags);
+# until then, and for the monthly cost, a background task (see main.py) polls.
+SNAPSHOT_REFRESH_SECONDS = 60
+_SNAPSHOT: dict = {
+    "user_departments": {},  # email -> department
+    "user_roles": {},  # email -> role (kept only by the users listener)
+    "department_budgets": {},  # department (or project key) -> amount
+    "monthly_cost": None,
+    "monthly_cost_at": None,  # time.time() when monthly_cost was fetched
+    "users_live": False,
+    "budgets_live": False,
+}
+# Parts of the snapshot the request guard reads: user departments for the onboarding
+# check (department scope only), budgets and cost only when budget checks are enabled.
+_TRACK_USERS = cfg.BUDGET_SCOPE != "project"
+_TRACK_BUDGETS = cfg.BUDGET_CHECK_ENABLED
+_TRACK_COST = cfg.BUDGET_CHECK_ENABLED
+# Active Firestore watches keyed by the "*_live" flag they maintain.
+_LISTENERS: dict = {}
+# A snapshot cost older than this (e.g. BigQuery has been failing) is treated as missing.
+_SNAPSHOT_COST_MAX_AGE_SECONDS = 3 * cfg.BUDGET_COST_CACHE_TTL
+
 
 @dataclass(frozen=True)
 class BudgetStatus:
@@ -31,27 +92,127 @@ class BudgetStatus:
     error: Optional[str] = None
 
 
+@dataclass(frozen=True)
+class AccessRestrictedBundle:
+    """Everything the access restricted page reads on first render."""
+    department: Optional[str]
+    budget: Optional[float]
+    monthly_cost: Optional[float]
+    role: Optional[str]
+
+
 def _budget_db() -> firestore.Client:
     """Returns a Firestore client for the budget database (separate DB)."""
     return FirebaseClient(cfg.BUDGET_DB_ID).get_client()
 
 
+def _budget_async_db() -> firestore.AsyncClient:
+    """Returns an async Firestore client for the budget database."""
+    return AsyncFirebaseClient(cfg.BUDGET_DB_ID).get_client()
+
+
+def _warm_budget_db() -> None:
+    """Builds the budget Firestore client and opens its channel with one small read.
+
+    Runs in a daemon thread at import so credential refresh and TCP/TLS setup are
+    not paid by the first page render or guarded request.
+    """
+    try:
+        _budget_db().collection(cfg.BUDGETS_COLLECTION).document(cfg.BUDGET_PROJECT_KEY).get()
+    except Exception:  # noqa: BLE001 - best effort; the first real call will surface errors
+        pass
+
+
+if cfg.BUDGET_CHECK_ENABLED:
+    threading.Thread(target=_warm_budget_db, name="budget-warmup", daemon=True).start()
+
+
+def _department_from_doc(doc) -> Optional[str]:
+    """Extracts the department field from a users document snapshot."""
+    if not doc.exists:
+        return None
+    dept = (doc.to_dict() or {}).get("department")
+    if isinstance(dept, str) and dept:
+        return dept
+    return None
+
+
+def _role_from_doc(doc) -> Optional[str]:
+    """Extracts the lowercase role ("Project_Role" or legacy "role") from a users document snapshot."""
+    if not doc.exists:
+        return None
+    data = doc.to_dict() or {}
+    role = data.get("Project_Role") or data.get("role")
+    if isinstance(role, str) and role:
+        return role.strip().lower()
+    return None
+
+
+def _amount_from_doc(doc) -> Optional[float]:
+    """Extracts the numeric amount field from a budgets document snapshot."""
+    if not doc.exists:
+        return None
+    amount = (doc.to_dict() or {}).get("amount")
+    try:
+        return float(amount) if amount is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _cache_department(email: str, dept: Optional[str]) -> None:
+    # Only found departments are cached: a user who has just onboarded on another
+    # instance must not be sent back to setup until a cached miss expires.
+    if not dept:
+        return
+    with _CACHE_LOCK:
+        _USER_DEPT_CACHE[email] = dept
+        _LAST_KNOWN_DEPT[email] = dept
+
+
+def _cache_budget(department: str, budget: Optional[float]) -> None:
+    with _CACHE_LOCK:
+        _DEPT_BUDGET_CACHE[department] = budget
+
+
 def get_user_department(email: str) -> Optional[str]:
     """Fetches the department for a user email from the users collection.
 
     Collection: users (in database `creative-studio-budget-allocation` by default)
     Document ID: email
     Field: department (str)
+
+    Served from the listener-maintained snapshot when live; otherwise found
+    departments are cached for a short TTL (misses are always re-read).
     """
+    if _SNAPSHOT["users_live"]:
+        return _SNAPSHOT["user_departments"].get(email)
+    with _CACHE_LOCK:
+        cached = _USER_DEPT_CACHE.get(email, _MISSING)
+    if cached is not _MISSING:
+        return cached
     db = _budget_db()
-    doc = db.collection(cfg.BUDGET_USERS_COLLECTION).document(email).get()
-    if not doc.exists:
-        return None
-    data = doc.to_dict() or {}
-    dept = data.get("department")
-    if isinstance(dept, str) and dept:
-        return dept
-    return None
+    dept = _department_from_doc(db.collection(cfg.BUDGET_USERS_COLLECTION).document(email).get())
+    _cache_department(email, dept)
+    return dept
+
+
+async def aget_user_department(email: str) -> Optional[str]:
+    """Async variant of get_user_department for use on the event loop."""
+    if _SNAPSHOT["users_live"]:
+        return _SNAPSHOT["user_departments"].get(email)
+    with _CACHE_LOCK:
+        cached = _USER_DEPT_CACHE.get(email, _MISSING)
+    if cached is not _MISSING:
+        return cached
+    return await _aread_user_department(email)
+
+
+async def _aread_user_department(email: str) -> Optional[str]:
+    """Reads a user's department from Firestore, bypassing the snapshot and caches."""
+    db = _budget_async_db()
+    dept = _department_from_doc(await db.collection(cfg.BUDGET_USERS_COLLECTION).document(email).get())
+    _cache_department(email, dept)
+    return dept
 
 
 def upsert_user_department(email: str, department: str, role: Optional[str] = None) -> None:
@@ -61,6 +222,14 @@ def upsert_user_department(email: str, department: str, role: Optional[str] = No
     if role:
         payload.update({"Project_Role": role})
     db.collection(cfg.BUDGET_USERS_COLLECTION).document(email).set(payload, merge=True)
+    with _CACHE_LOCK:
+        _USER_DEPT_CACHE.pop(email, None)
+        _LAST_KNOWN_DEPT[email] = department
+        if role:
+            _USER_ROLE_CACHE.pop(email, None)
+    _SNAPSHOT["user_departments"][email] = department
+    if role:
+        _SNAPSHOT["user_roles"][email] = role.strip().lower()
 
 
 def get_department_budget(department: str) -> Optional[float]:
@@ -69,17 +238,89 @@ def get_department_budget(department: str) -> Optional[float]:
     Collection: budgets
     Document ID: department
     Field: amount (number)
+
+    Served from the listener-maintained snapshot when live; otherwise results
+    (including "no budget") are cached for a short TTL.
     """
+    if _SNAPSHOT["budgets_live"]:
+        return _SNAPSHOT["department_budgets"].get(department)
+    with _CACHE_LOCK:
+        cached = _DEPT_BUDGET_CACHE.get(department, _MISSING)
+    if cached is not _MISSING:
+        return cached
     db = _budget_db()
-    doc = db.collection(cfg.BUDGETS_COLLECTION).document(department).get()
-    if not doc.exists:
-        return None
-    data = doc.to_dict() or {}
-    amount = data.get("amount")
-    try:
-        return float(amount) if amount is not None else None
-    except (TypeError, ValueError):
-        return None
+    budget = _amount_from_doc(db.collection(cfg.BUDGETS_COLLECTION).document(department).get())
+    _cache_budget(department, budget)
+    return budget
+
+
+async def aget_department_budget(department: str) -> Optional[float]:
+    """Async variant of get_department_budget for use on the event loop."""
+    if _SNAPSHOT["budgets_live"]:
+        return _SNAPSHOT["department_budgets"].get(department)
+    with _CACHE_LOCK:
+        cached = _DEPT_BUDGET_CACHE.get(department, _MISSING)
+    if cached is not _MISSING:
+        return cached
+    return await _aread_department_budget(department)
+
+
+async def _aread_department_budget(department: str) -> Optional[float]:
+    """Reads a department budget from Firestore, bypassing the snapshot and caches."""
+    db = _budget_async_db()
+    budget = _amount_from_doc(await db.collection(cfg.BUDGETS_COLLECTION).document(department).get())
+    _cache_budget(department, budget)
+    return budget
+
+
+def _cached_user_and_budget(email: str) -> Optional[tuple[Optional[str], Optional[float]]]:
+    """Returns (department, budget) if known from the snapshot or TTL caches, else None."""
+    if _SNAPSHOT["users_live"] and _SNAPSHOT["budgets_live"]:
+        dept = _SNAPSHOT["user_departments"].get(email)
+        return dept, (_SNAPSHOT["department_budgets"].get(dept) if dept else None)
+    with _CACHE_LOCK:
+        dept = _USER_DEPT_CACHE.get(email, _MISSING)
+        if dept is _MISSING:
+            return None
+        budget = _DEPT_BUDGET_CACHE.get(dept, _MISSING)
+    return None if budget is _MISSING else (dept, budget)
+
+
+def get_user_and_budget(email: str, maybe_dept: Optional[str] = None) -> tuple[Optional[str], Optional[float]]:
+    """Resolves a user's department and that department's budget.
+
+    Served from the snapshot or TTL caches when possible. Otherwise, when a department can be
+    guessed (`maybe_dept`, or the last one seen for this email), the user and
+    budget documents are fetched together with a single `get_all` call. Without a guess, or if the guess was wrong, the budget is
+    read separately.
+    """
+    cached = _cached_user_and_budget(email)
+    if cached is not None:
+        return cached
+    if maybe_dept:
+        guess = maybe_dept
+    else:
+        with _CACHE_LOCK:
+            guess = _LAST_KNOWN_DEPT.get(email)
+    if not guess:
+        dept = get_user_department(email)
+        return dept, (get_department_budget(dept) if dept else None)
+    db = _budget_db()
+    user_ref = db.collection(cfg.BUDGET_USERS_COLLECTION).document(email)
+    budget_ref = db.collection(cfg.BUDGETS_COLLECTION).document(guess)
+    dept, guessed_budget = None, None
+    for doc in db.get_all([user_ref, budget_ref]):
+        if doc.reference.path == user_ref.path:
+            dept = _department_from_doc(doc)
+        else:
+            guessed_budget = _amount_from_doc(doc)
+    _cache_department(email, dept)
+    _cache_budget(guess, guessed_budget)
+    if not dept:
+        return None, None
+    if dept == guess:
+        return dept, guessed_budget
+    return dept, get_department_budget(dept)
 
 
 def get_project_budget() -> Optional[float]:
@@ -89,16 +330,10 @@ def get_project_budget() -> Optional[float]:
     Document ID: cfg.BUDGET_PROJECT_KEY (default: "creative-studio-budget")
     Field: amount (number)
     """
+    if _SNAPSHOT["budgets_live"]:
+        return _SNAPSHOT["department_budgets"].get(cfg.BUDGET_PROJECT_KEY)
     db = _budget_db()
-    doc = db.collection(cfg.BUDGETS_COLLECTION).document(cfg.BUDGET_PROJECT_KEY).get()
-    if not doc.exists:
-        return None
-    data = doc.to_dict() or {}
-    amount = data.get("amount")
-    try:
-        return float(amount) if amount is not None else None
-    except (TypeError, ValueError):
-        return None
+    return _amount_from_doc(db.collection(cfg.BUDGETS_COLLECTION).document(cfg.BUDGET_PROJECT_KEY).get())
 
 
 def set_department_budget(department: str, amount: float) -> None:
@@ -107,6 +342,9 @@ def set_department_budget(department: str, amount: float) -> None:
     db.collection(cfg.BUDGETS_COLLECTION).document(department).set(
         {"amount": float(amount)}, merge=True
     )
+    with _CACHE_LOCK:
+        _DEPT_BUDGET_CACHE.pop(department, None)
+    _SNAPSHOT["department_budgets"][department] = float(amount)
 
 
 def list_departments() -> list[str]:
@@ -121,12 +359,188 @@ def list_departments() -> list[str]:
         return []
 
 
+def list_all_departments_and_budgets() -> dict[str, Optional[float]]:
+    """Returns {department: amount} for every document in the budgets collection.
+
+    Includes the project-level budget document (BUDGET_PROJECT_KEY) if present.
+    """
+    db = _budget_db()
+    budgets: dict[str, Optional[float]] = {}
+    for doc in db.collection(cfg.BUDGETS_COLLECTION).stream():
+        amount = (doc.to_dict() or {}).get("amount")
+        try:
+            budgets[doc.id] = float(amount) if amount is not None else None
+        except (TypeError, ValueError):
+            budgets[doc.id] = None
+    return budgets
+
+
+def list_all_user_departments() -> dict[str, str]:
+    """Returns {email: department} for every user with a department set."""
+    db = _budget_db()
+    departments: dict[str, str] = {}
+    for doc in db.collection(cfg.BUDGET_USERS_COLLECTION).stream():
+        dept = (doc.to_dict() or {}).get("department")
+        if isinstance(dept, str) and dept:
+            departments[doc.id] = dept
+    return departments
+
+
+def refresh_snapshot(include_cost: bool = True) -> None:
+    """Reloads the in-memory budget snapshot from Firestore (and BigQuery).
+
+    Collections already kept current by an active snapshot listener are skipped;
+    if a listener's watch has stopped, its collection is polled again.
+    Blocking; intended to be run off the event loop by the background refresher.
+    """
+    _expire_dead_listeners()
+    if _TRACK_USERS and not _SNAPSHOT["users_live"]:
+        _SNAPSHOT["user_departments"] = list_all_user_departments()
+    if _TRACK_BUDGETS and not _SNAPSHOT["budgets_live"]:
+        _SNAPSHOT["department_budgets"] = list_all_departments_and_budgets()
+    if include_cost and _TRACK_COST:
+        cost = get_monthly_cloud_cost()
+        if cost is not None:
+            _SNAPSHOT["monthly_cost"] = cost
+            _SNAPSHOT["monthly_cost_at"] = time.time()
+
+
+def _on_users_snapshot(docs, changes, read_time) -> None:  # pylint: disable=unused-argument
+    """Applies pushed changes from the users collection to the snapshot."""
+    departments = _SNAPSHOT["user_departments"]
+    roles = _SNAPSHOT["user_roles"]
+    for change in changes:
+        doc = change.document
+        removed = change.type.name == "REMOVED"
+        dept = None if removed else _department_from_doc(doc)
+        role = None if removed else _role_from_doc(doc)
+        if dept:
+            departments[doc.id] = dept
+        else:
+            departments.pop(doc.id, None)
+        if role:
+            roles[doc.id] = role
+        else:
+            roles.pop(doc.id, None)
+    _SNAPSHOT["users_live"] = True
+
+
+def _on_budgets_snapshot(docs, changes, read_time) -> None:  # pylint: disable=unused-argument
+    """Applies pushed changes from the budgets collection to the snapshot."""
+    budgets = _SNAPSHOT["department_budgets"]
+    for change in changes:
+        doc = change.document
+        if change.type.name == "REMOVED":
+            budgets.pop(doc.id, None)
+        else:
+            budgets[doc.id] = _amount_from_doc(doc)
+    _SNAPSHOT["budgets_live"] = True
+
+
+def _expire_dead_listeners() -> None:
+    """Clears the "*_live" flag of any listener whose watch is no longer active.
+
+    A watch that hits an unrecoverable error closes without notifying us, which
+    would otherwise freeze that part of the snapshot.
+    """
+    for flag, watch in list(_LISTENERS.items()):
+        if not watch.is_active:
+            logging.warning("[budget] snapshot_listener_inactive flag=%s; polling instead", flag)
+            _SNAPSHOT[flag] = False
+            del _LISTENERS[flag]
+
+
+def snapshot_needed() -> bool:
+    """Whether the request guard reads anything from the snapshot in this configuration."""
+    return _TRACK_USERS or _TRACK_BUDGETS
+
+
+def start_snapshot_listeners() -> None:
+    """Attaches Firestore listeners that push users/budgets changes into the snapshot.
+
+    Only the collections the guard reads are watched. The initial callback
+    delivers every document, after which lookups are served from memory without RPCs.
+    """
+    if _LISTENERS:
+        return
+    db = _budget_db()
+    if _TRACK_USERS:
+        _LISTENERS["users_live"] = db.collection(cfg.BUDGET_USERS_COLLECTION).on_snapshot(_on_users_snapshot)
+    if _TRACK_BUDGETS:
+        _LISTENERS["budgets_live"] = db.collection(cfg.BUDGETS_COLLECTION).on_snapshot(_on_budgets_snapshot)
+
+
+def stop_snapshot_listeners() -> None:
+    """Detaches the snapshot listeners and falls back to direct lookups."""
+    _SNAPSHOT["users_live"] = False
+    _SNAPSHOT["budgets_live"] = False
+    while _LISTENERS:
+        _LISTENERS.popitem()[1].unsubscribe()
+
+
+async def snapshot_user_department(email: str) -> Optional[str]:
+    """Returns the user's department from the snapshot, falling back to a Firestore read.
+
+    A miss is read directly (not through the snapshot or caches): the profile may
+    have just been written by another worker whose change has not reached us yet.
+    """
+    dept = _SNAPSHOT["user_departments"].get(email)
+    if dept:
+        return dept
+    dept = await _aread_user_department(email)
+    if dept:
+        _SNAPSHOT["user_departments"][email] = dept
+    return dept
+
+
+async def snapshot_department_budget(department: str) -> Optional[float]:
+    """Returns a department (or project key) budget from the snapshot, falling back to a Firestore read.
+
+    As with snapshot_user_department, a miss is read directly so a budget just
+    saved on another worker is seen immediately.
+    """
+    budget = _SNAPSHOT["department_budgets"].get(department)
+    if budget is not None:
+        return budget
+    budget = await _aread_department_budget(department)
+    if budget is not None:
+        _SNAPSHOT["department_budgets"][department] = budget
+    return budget
+
+
+async def snapshot_monthly_cloud_cost() -> Optional[float]:
+    """Returns this month's cost from the snapshot, falling back to a (cached) query."""
+    cost = _snapshot_cost()
+    if cost is not None:
+        return cost
+    return await aget_monthly_cloud_cost()
+
+
+def _snapshot_cost() -> Optional[float]:
+    """Returns the snapshot cost, or None if it is too old or from an earlier month."""
+    cost, fetched_at = _SNAPSHOT["monthly_cost"], _SNAPSHOT["monthly_cost_at"]
+    if cost is None or fetched_at is None:
+        return None
+    if time.time() - fetched_at > _SNAPSHOT_COST_MAX_AGE_SECONDS:
+        return None
+    fetched_month = datetime.date.fromtimestamp(fetched_at).replace(day=1)
+    if fetched_month != datetime.date.today().replace(day=1):
+        return None
+    return cost
+
+
 def upsert_user_profile(email: str, department: str, role: str) -> None:
     """Creates or updates a user's profile (department and role)."""
     db = _budget_db()
     db.collection(cfg.BUDGET_USERS_COLLECTION).document(email).set(
         {"department": department, "role": role}, merge=True
     )
+    with _CACHE_LOCK:
+        _USER_DEPT_CACHE.pop(email, None)
+        _USER_ROLE_CACHE.pop(email, None)
+        _LAST_KNOWN_DEPT[email] = department
+    _SNAPSHOT["user_departments"][email] = department
+    _SNAPSHOT["user_roles"][email] = role.strip().lower()
 
 
 def get_user_role(email: str) -> Optional[str]:
@@ -134,16 +548,22 @@ def get_user_role(email: str) -> Optional[str]:
 
     Checks both "Project_Role" and legacy "role" fields.
     Returns a lowercase role string (e.g., "admin", "user") or None.
+
+    Served from the listener-maintained snapshot when live; otherwise results are
+    cached for _LOOKUP_CACHE_TTL_SECONDS, which bounds how stale a role change
+    made on another instance can be.
     """
+    if _SNAPSHOT["users_live"]:
+        return _SNAPSHOT["user_roles"].get(email)
+    with _CACHE_LOCK:
+        cached = _USER_ROLE_CACHE.get(email, _MISSING)
+    if cached is not _MISSING:
+        return cached
     db = _budget_db()
-    doc = db.collection(cfg.BUDGET_USERS_COLLECTION).document(email).get()
-    if not doc.exists:
-        return None
-    data = doc.to_dict() or {}
-    role = data.get("Project_Role") or data.get("role")
-    if isinstance(role, str) and role:
-        return role.strip().lower()
-    return None
+    role = _role_from_doc(db.collection(cfg.BUDGET_USERS_COLLECTION).document(email).get())
+    with _CACHE_LOCK:
+        _USER_ROLE_CACHE[email] = role
+    return role
 
 
 def get_monthly_cloud_cost(project_id: Optional[str] = None) -> Optional[float]:
@@ -154,7 +574,8 @@ def get_monthly_cloud_cost(project_id: Optional[str] = None) -> Optional[float]:
     - BILLING_DATASET
     - BILLING_TABLE
 
-    Returns None if not configured or on query errors.
+    Successful results are cached for BUDGET_COST_CACHE_TTL seconds, failures
+    for _COST_FAILURE_TTL_SECONDS. Returns None if not configured or on query errors.
     """
     billing_dataset = cfg.BILLING_DATASET
     billing_table = cfg.BILLING_TABLE
@@ -164,107 +585,232 @@ def get_monthly_cloud_cost(project_id: Optional[str] = None) -> Optional[float]:
     if not (billing_project and billing_dataset and billing_table and target_project):
         return None
 
-    client = bigquery.Client(project=billing_project)
+    cached = _cached_cost(target_project)
+    if cached is not _MISSING:
+        return cached
+    with _COST_CACHE_LOCK:
+        query_lock = _COST_QUERY_LOCKS.setdefault(target_project, threading.Lock())
+    with query_lock:
+        # Double-checked: another caller may have refreshed while we waited
+        cached = _cached_cost(target_project)
+        if cached is not _MISSING:
+            return cached
+        cost = _query_monthly_cloud_cost(billing_project, billing_dataset, billing_table, target_project)
+        ttl = cfg.BUDGET_COST_CACHE_TTL if cost is not None else _COST_FAILURE_TTL_SECONDS
+        with _COST_CACHE_LOCK:
+            _COST_CACHE[target_project] = (cost, time.monotonic() + ttl)
+    return cost
+
+
+def _cached_cost(target_project: str):
+    """Returns the unexpired cached cost for a project, or _MISSING."""
+    with _COST_CACHE_LOCK:
+        cached = _COST_CACHE.get(target_project)
+    if cached is not None and time.monotonic() < cached[1]:
+        return cached[0]
+    return _MISSING
+
+
+def _cost_job_config(params: list) -> bigquery.QueryJobConfig:
+    """Builds the job config for a billing export query.
+
+    The byte cap is only set when configured: the client serializes an unset
+    (None) cap as the string "None", which BigQuery rejects.
+    """
+    job_config = bigquery.QueryJobConfig(
+        query_parameters=params,
+        use_query_cache=True,
+        use_legacy_sql=False,
+    )
+    if cfg.BILLING_MAX_BYTES_BILLED is not None:
+        job_config.maximum_bytes_billed = cfg.BILLING_MAX_BYTES_BILLED
+    return job_config
+
+
+def _query_monthly_cloud_cost(
+    billing_project: str, billing_dataset: str, billing_table: str, target_project: str
+) -> Optional[float]:
+    """Runs the billing export query for this month's cost. Returns None on errors."""
+    client = gcp_clients.bigquery_client(billing_project)
 
     start = datetime.date.today().replace(day=1)
     end = datetime.date.today() + datetime.timedelta(days=1)
 
     table_fqn = f"`{billing_project}.{billing_dataset}.{billing_table}`"
 
-    # The official export has usage_start_time; fall back to invoice.month if present.
-    query = f"""
-        SELECT
-          SUM(CAST(cost AS NUMERIC)) AS total_cost
-        FROM {table_fqn}
-        WHERE project.id = @project_id
-          AND DATE(usage_start_time) >= @start_date
-          AND DATE(usage_start_time) < @end_date
-    """
-
-    job_config = bigquery.QueryJobConfig(
-        query_parameters=[
-            bigquery.ScalarQueryParameter("project_id", "STRING", target_project),
-            bigquery.ScalarQueryParameter("start_date", "DATE", start),
-            bigquery.ScalarQueryParameter("end_date", "DATE", end),
-        ]
-    )
-
-    try:
-        result = client.query(query, job_config=job_config).result()
+    date_params = [
+        bigquery.ScalarQueryParameter("project_id", "STRING", target_project),
+        bigquery.ScalarQueryParameter("start_date", "DATE", start),
+        bigquery.ScalarQueryParameter("end_date", "DATE", end),
+    ]
+    ym = datetime.date.today().strftime("%Y%m")
+    # Tried in order until one succeeds:
+    # 1. The official export is ingestion-time partitioned; filtering on
+    #    _PARTITIONTIME and a plain TIMESTAMP range on usage_start_time lets
+    #    BigQuery prune partitions outside the current month.
+    # 2. Same range without the pseudocolumn, for unpartitioned tables/views.
+    # 3. invoice.month, for exports without usage_start_time.
+    attempts = [
+        (
+            f"""
+            SELECT SUM(CAST(cost AS NUMERIC)) AS total_cost
+            FROM {table_fqn}
+            WHERE _PARTITIONTIME >= TIMESTAMP(@start_date)
+              AND _PARTITIONTIME < TIMESTAMP(@end_date)
+              AND usage_start_time >= TIMESTAMP(@start_date)
+              AND usage_start_time < TIMESTAMP(@end_date)
+              AND project.id = @project_id
+            """,
+            date_params,
+        ),
+        (
+            f"""
+            SELECT SUM(CAST(cost AS NUMERIC)) AS total_cost
+            FROM {table_fqn}
+            WHERE project.id = @project_id
+              AND usage_start_time >= TIMESTAMP(@start_date)
+              AND usage_start_time < TIMESTAMP(@end_date)
+            """,
+            date_params,
+        ),
+        (
+            f"""
+            SELECT SUM(CAST(cost AS NUMERIC)) AS total_cost
+            FROM {table_fqn}
+            WHERE project.id = @project_id AND invoice.month = @ym
+            """,
+            [
+                bigquery.ScalarQueryParameter("project_id", "STRING", target_project),
+                bigquery.ScalarQueryParameter("ym", "STRING", ym),
+            ],
+        ),
+    ]
+
+    for query, params in attempts:
+        try:
+            job_config = _cost_job_config(params)
+            # query_and_wait can answer short queries without creating a job to poll.
+            result = client.query_and_wait(
+                query, job_config=job_config, location=cfg.BILLING_LOCATION
+            )
+        except Exception:
+            continue
         row = next(iter(result), None)
         if not row:
             return 0.0
         total = row["total_cost"]
         return float(total) if total is not None else 0.0
-    except Exception:
-        # Try a fallback using invoice.month if the first query fails due to schema
-        try:
-            ym = datetime.date.today().strftime("%Y%m")
-            fallback_query = f"""
-                SELECT SUM(CAST(cost AS NUMERIC)) AS total_cost
-                FROM {table_fqn}
-                WHERE project.id = @project_id AND invoice.month = @ym
-            """
-            fallback_cfg = bigquery.QueryJobConfig(
-                query_parameters=[
-                    bigquery.ScalarQueryParameter("project_id", "STRING", target_project),
-                    bigquery.ScalarQueryParameter("ym", "STRING", ym),
-                ]
-            )
-            result = client.query(fallback_query, job_config=fallback_cfg).result()
-            row = next(iter(result), None)
-            if not row:
-                return 0.0
-            total = row["total_cost"]
-            return float(total) if total is not None else 0.0
-        except Exception:
-            return None
+    return None
+
+
+def _budget_status(
+    email: str, department: Optional[str], budget: Optional[float], cost: Optional[float]
+) -> BudgetStatus:
+    """Builds a BudgetStatus from already-resolved budget and cost values."""
+    if budget is None:
+        return BudgetStatus(email=email, department=department, budget=None, monthly_cost=None, within_budget=None, error="missing_budget")
+    if cost is None:
+        return BudgetStatus(email=email, department=department, budget=budget, monthly_cost=None, within_budget=None, error="cost_unavailable")
+    return BudgetStatus(
+        email=email,
+        department=department,
+        budget=budget,
+        monthly_cost=cost,
+        within_budget=(cost <= budget),
+    )
 
 
 def evaluate_budget(email: str) -> BudgetStatus:
     """Computes the budget status for the given user email.
 
     In department mode (default):
-    - Finds user's department.
-    - Reads department budget.
-    - Computes current month cost.
+    - Finds user's department and reads its budget (batched when possible).
+    - Computes current month cost concurrently with the Firestore reads.
 
     In project mode:
     - Skips department lookup.
-    - Reads project budget by key.
-    - Computes current month cost.
+    - Reads project budget by key and computes current month cost concurrently.
     """
     if cfg.BUDGET_SCOPE == "project":
-        budget = get_project_budget()
-        if budget is None:
-            return BudgetStatus(email=email, department=None, budget=None, monthly_cost=None, within_budget=None, error="missing_budget")
+        budget_future = _EXECUTOR.submit(get_project_budget)
         cost = get_monthly_cloud_cost()
-        if cost is None:
-            return BudgetStatus(email=email, department=None, budget=budget, monthly_cost=None, within_budget=None, error="cost_unavailable")
-        return BudgetStatus(
-            email=email,
-            department=None,
-            budget=budget,
-            monthly_cost=cost,
-            within_budget=(cost <= budget),
-        )
-    # Department mode (default)
-    dept = get_user_department(email)
+        return _budget_status(email, None, budget_future.result(), cost)
+    # Department mode (default): the cost query does not depend on the department
+    cost_future = _EXECUTOR.submit(get_monthly_cloud_cost)
+    dept, budget = get_user_and_budget(email)
     if not dept:
         return BudgetStatus(email=email, department=None, budget=None, monthly_cost=None, within_budget=None, error="missing_user")
+    return _budget_status(email, dept, budget, cost_future.result())
 
-    budget = get_department_budget(dept)
-    if budget is None:
-        return BudgetStatus(email=email, department=dept, budget=None, monthly_cost=None, within_budget=None, error="missing_budget")
 
-    cost = get_monthly_cloud_cost()
-    if cost is None:
-        return BudgetStatus(email=email, department=dept, budget=budget, monthly_cost=None, within_budget=None, error="cost_unavailable")
+# Errors worth one quick retry before the page shows a value as unavailable.
+_TRANSIENT_ERRORS = (ServiceUnavailable, DeadlineExceeded)
+_TRANSIENT_RETRY_DELAY_SECONDS = 0.1
+# Failures the page shows as "unavailable": API errors, exhausted client retries,
+# and credential refresh/transport errors.
+_READ_ERRORS = (GoogleAPICallError, RetryError, GoogleAuthError)
 
-    return BudgetStatus(
-        email=email,
+
+def _read_or_none(read, *args):
+    """Runs a page read, retrying once on transient API errors.
+
+    Returns None when the call fails with an API, retry or auth error (e.g.
+    NotFound, PermissionDenied, RefreshError, or a second transient failure);
+    any other exception is a bug and propagates.
+    """
+    try:
+        return read(*args)
+    except _TRANSIENT_ERRORS:
+        time.sleep(_TRANSIENT_RETRY_DELAY_SECONDS)
+    except _READ_ERRORS:
+        return None
+    try:
+        return read(*args)
+    except _READ_ERRORS:
+        return None
+
+
+def get_access_restricted_bundle(email: str) -> AccessRestrictedBundle:
+    """Loads department, budget, monthly cost and role for the access restricted page.
+
+    The reads are independent, so they run side by side on the shared executor and
+    the page pays roughly one round-trip instead of four. A failed read yields None
+    for its field rather than failing the whole bundle.
+    """
+    cost_future = _EXECUTOR.submit(_read_or_none, get_monthly_cloud_cost)
+    role_future = _EXECUTOR.submit(_read_or_none, get_user_role, email)
+    dept: Optional[str] = None
+    budget: Optional[float] = None
+    if cfg.BUDGET_SCOPE == "project":
+        budget = _read_or_none(get_project_budget)
+    else:
+        dept, budget = _read_or_none(get_user_and_budget, email) or (None, None)
+    return AccessRestrictedBundle(
         department=dept,
         budget=budget,
-        monthly_cost=cost,
-        within_budget=(cost <= budget),
+        monthly_cost=cost_future.result(),
+        role=role_future.result(),
     )
+
+
+def set_department_budget_and_evaluate(email: str, department: str, amount: float) -> BudgetStatus:
+    """Sets a department budget and returns the resulting status for the user.
+
+    Equivalent to set_department_budget followed by evaluate_budget, minus the
+    budget re-read: the amount just written is used directly when it is the
+    user's department, and the cost query runs alongside the write.
+    """
+    cost_future = _EXECUTOR.submit(get_monthly_cloud_cost)
+    set_department_budget(department, amount)
+    if cfg.BUDGET_SCOPE == "project":
+        return _budget_status(email, None, get_project_budget(), cost_future.result())
+    user_dept = get_user_department(email)
+    if not user_dept:
+        return BudgetStatus(email=email, department=None, budget=None, monthly_cost=None, within_budget=None, error="missing_user")
+    budget = float(amount) if user_dept == department else get_department_budget(user_dept)
+    return _budget_status(email, user_dept, budget, cost_future.result())
+
+
+async def aget_monthly_cloud_cost(project_id: Optional[str] = None) -> Optional[float]:
+    """Async wrapper around get_monthly_cloud_cost; the query runs in a worker thread."""
+    return await asyncio.to_thread(get_monthly_cloud_cost, project_id)
@@ -4,6 +4,8 @@ Accessible when a user's department monthly cost exceeds allocated budget or no
 Allows selecting a department and updating its budget.
 """
 
+import re
+
 import mesop as me  # type: ignore
 from components.dialog import dialog, dialog_actions  # use shared dialog component
 
@@ -13,6 +15,75 @@ from config.default import Default
 from models import budget as budget_service
 from state.state import AppState
 
+cfg = Default()
+
+# A positive decimal amount as typed into the budget field
+_NUM_RE = re.compile(r"^\d+(?:\.\d+)?\Z")
+
+# Title and message for each blocked mode ("missing" budget or budget "exceeded"),
+# keyed by budget scope; the scope is fixed per process, so pick it once.
+_COPY_BY_SCOPE = {
+    "project": {
+        "missing": (
+            "Budget Not Set",
+            "Access is blocked because no budget is set for the project. "
+            "Please contact an admin to set a budget.",
+        ),
+        "exceeded": (
+            "Budget Exceeded",
+            "Access is temporarily blocked because monthly costs exceed the project’s budget.",
+        ),
+    },
+    "department": {
+        "missing": (
+            "Budget Not Set",
+            "Access is blocked because no budget is set for your department. "
+            "Please contact an admin to set a budget.",
+        ),
+        "exceeded": (
+            "Budget Exceeded",
+            "Access is temporarily blocked because monthly costs exceed your department’s budget.",
+        ),
+    },
+}
+_COPY = _COPY_BY_SCOPE["project" if cfg.BUDGET_SCOPE == "project" else "department"]
+
+# Styles are plain data and never change between renders, so build them once.
+_CENTERED_SECTION_STYLE = me.Style(display="flex", justify_content="center", margin=me.Margin(top=24))
+_MESSAGE_ROW_STYLE = me.Style(display="flex", justify_content="center", margin=me.Margin(top=12))
+_TITLE_ROW_STYLE = me.Style(display="flex", align_items="center", gap=12)
+_ERROR_TEXT_STYLE = me.Style(color=me.theme_var("error"))
+_ERROR_HEADLINE_STYLE = me.Style(color=me.theme_var("error"), font_family="Google Sans")
+_CARD_STYLE = me.Style(
+    background=me.theme_var("surface"),
+    border_radius=16,
+    box_shadow=me.theme_var("shadow_elevation_2"),
+    padding=me.Padding.all(24),
+    width="min(720px, 100%)",
+    display="flex",
+    flex_direction="column",
+    gap=16,
+)
+_ROW_STYLE = me.Style(
+    display="flex",
+    justify_content="space-between",
+    align_items="center",
+    padding=me.Padding(top=8, bottom=8),
+)
+_ACTIONS_ROW_STYLE = me.Style(display="flex", justify_content="flex-end", margin=me.Margin(top=8))
+_UPDATE_BUTTON_STYLE = me.Style(
+    background=me.theme_var("primary"),
+    color=me.theme_var("on-primary"),
+    padding=me.Padding(top=10, bottom=10, left=16, right=16),
+    border_radius=24,
+    font_weight="600",
+)
+_DIALOG_TITLE_STYLE = me.Style(font_family="Google Sans")
+_DIALOG_MESSAGE_STYLE = me.Style(margin=me.Margin(top=12))
+_DIALOG_FORM_STYLE = me.Style(display="flex", flex_direction="column", gap=12, margin=me.Margin(top=12))
+_FIELD_LABEL_STYLE = me.Style(color=me.theme_var("on-tertiary-container"))
+_AMOUNT_INPUT_STYLE = me.Style(width="320px")
+
 @me.stateclass
 class PageState:
     selected_department: str | None = None
@@ -22,202 +93,161 @@ class PageState:
     error_message: str = ""
     current_budget: float | None = None
     current_cost: float | None = None
+    # Display strings for the amounts above, formatted only when they change
+    current_budget_label: str = "Not set"
+    current_cost_label: str = "Unavailable"
     edit_dialog_open: bool = False
+    role: str | None = None
+    loaded: bool = False
+
+# (label, value getter) for each row of the summary table, per budget scope.
+_ROW_SPEC_PROJECT = (
+    ("User email", lambda st, app: app.user_email),
+    ("Scope", lambda st, app: "Project"),
+    ("Current monthly cost", lambda st, app: st.current_cost_label),
+    ("Budget", lambda st, app: st.current_budget_label),
+)
+_ROW_SPEC_DEPT = (
+    ("User email", lambda st, app: app.user_email),
+    ("Department", lambda st, app: st.selected_department or "—"),
+    ("Current monthly cost", lambda st, app: st.current_cost_label),
+    ("Budget", lambda st, app: st.current_budget_label),
+)
+# The scope is fixed per process, so pick the spec once.
+_ROW_SPEC = _ROW_SPEC_PROJECT if cfg.BUDGET_SCOPE == "project" else _ROW_SPEC_DEPT
+
+def _row(label: str, value: str):
+    with me.box(style=_ROW_STYLE):
+        me.text(label, type="subtitle-2", style=_ERROR_TEXT_STYLE)
+        me.text(value, type="body-1", style=_ERROR_TEXT_STYLE)
+
+def _set_amounts(st: PageState, budget: float | None, cost: float | None) -> None:
+    """Stores budget and cost along with their display labels."""
+    st.current_budget = budget
+    st.current_cost = cost
+    st.current_budget_label = f"€{budget:,.2f}" if budget is not None else "Not set"
+    st.current_cost_label = f"€{cost:,.2f}" if cost is not None else "Unavailable"
 
 def on_click_update_budget(e: me.ClickEvent):  # pylint: disable=unused-argument
     st = me.state(PageState)
     app = me.state(AppState)
-    try:
-        if not st.selected_department:
-            st.error_message = "Please choose a department."
-            st.error_dialog_open = True
-            yield
-            return
-        amount = float(st.new_budget_input)
-        if amount <= 0:
-            raise ValueError("Budget must be greater than 0")
-        budget_service.set_department_budget(st.selected_department, amount)
-        # Re-check budget for the current user; if within budget, go home
-        status = budget_service.evaluate_budget(app.user_email)
-        if status.within_budget:
-            st.edit_dialog_open = False
-            st.new_budget_input = ""
-            me.navigate("/welcome")
-        else:
-            st.current_budget = amount
-            st.current_cost = status.monthly_cost
-            st.edit_dialog_open = False
-            st.new_budget_input = ""
+    if not st.selected_department:
+        st.error_message = "Please choose a department."
+        st.error_dialog_open = True
+        yield
+        return
+    # Validate with a predicate rather than letting float() raise on user input
+    if not _NUM_RE.match(st.new_budget_input):
+        st.error_message = "Failed to update budget: enter an amount such as 1500 or 1500.50."
+        st.error_dialog_open = True
+        yield
+        return
+    amount = float(st.new_budget_input)
+    if amount <= 0:
+        st.error_message = "Failed to update budget: Budget must be greater than 0"
+        st.error_dialog_open = True
+        yield
+        return
+    if st.current_budget is not None and abs(amount - st.current_budget) < 1e-9:
+        # Unchanged amount: nothing to write or re-evaluate
+        st.edit_dialog_open = False
+        st.new_budget_input = ""
         yield
+        return
+    try:
+        # Write and re-check budget for the current user in one call; if within budget, go home
+        status = budget_service.set_department_budget_and_evaluate(
+            app.user_email, st.selected_department, amount
+        )
     except Exception as ex:  # noqa: BLE001
         st.error_message = f"Failed to update budget: {ex}"
         st.error_dialog_open = True
         yield
+        return
+    st.edit_dialog_open = False
+    st.new_budget_input = ""
+    _set_amounts(st, amount, status.monthly_cost)
+    if status.within_budget:
+        # Reload on the next visit in this session rather than showing these figures again
+        st.loaded = False
+        me.navigate("/welcome")
+    yield
 
 def on_budget_input(e):
     st = me.state(PageState)
-    try:
-        # textarea on_blur provides .value
-        st.new_budget_input = (e.value or "").strip()
-    except Exception:
-        # Fallback: ignore if structure differs
-        pass
+    # textarea on_blur provides .value; ignore if structure differs
+    value = (getattr(e, "value", None) or "").strip()
+    if value == st.new_budget_input:
+        # Nothing changed: skip the state write and the re-render it would cause
+        return
+    st.new_budget_input = value
     yield
 
 def access_restricted_content():
     app = me.state(AppState)
     st = me.state(PageState)
-    cfg = Default()
-    # If user has no department, bounce them to setup immediately
-    dept: str | None = None
-    if cfg.BUDGET_SCOPE != "project":
-        try:
-            dept = budget_service.get_user_department(app.user_email)
-        except Exception:
-            dept = None
-        if not dept:
+    dept: str | None = st.selected_department
+    # On first render load department, budget, cost and role in one concurrent call.
+    # An explicit flag (rather than selected_department, which stays None in project
+    # scope) keeps later renders from reloading.
+    if not st.loaded:
+        bundle = budget_service.get_access_restricted_bundle(app.user_email)
+        dept = bundle.department
+        # If user has no department, bounce them to setup immediately
+        if cfg.BUDGET_SCOPE != "project" and not dept:
             me.navigate("/setup_profile")
             return
-    # Default to user's department and load its current budget on first render
-    if not st.selected_department:
         st.selected_department = dept
-        try:
-            if cfg.BUDGET_SCOPE == "project":
-                st.current_budget = budget_service.get_project_budget()
-            else:
-                st.current_budget = budget_service.get_department_budget(st.selected_department)
-        except Exception:
-            st.current_budget = None
-        # Load current monthly cloud cost
-        try:
-            st.current_cost = budget_service.get_monthly_cloud_cost()
-        except Exception:
-            st.current_cost = None
-    # Determine user role for permissions
-    role = None
-    try:
-        role = budget_service.get_user_role(app.user_email)
-    except Exception:
-        role = None
+        _set_amounts(st, bundle.budget, bundle.monthly_cost)
+        st.role = bundle.role
+        st.loaded = True
+    role = st.role
     # Check if budget is missing for department
     budget_missing = st.current_budget is None
+    title, message = _COPY["missing" if budget_missing else "exceeded"]
     with page_frame():  # pylint: disable=E1129:not-context-manager
         # Big centered title row with warning icon
-        with me.box(style=me.Style(display="flex", justify_content="center", margin=me.Margin(top=24))):
-            with me.box(style=me.Style(display="flex", align_items="center", gap=12)):
-                me.text("⚠", type="headline-4", style=me.Style(color=me.theme_var("error")))
-                if budget_missing:
-                    me.text(
-                        "Budget Not Set",
-                        type="headline-4",
-                        style=me.Style(color=me.theme_var("error"), font_family="Google Sans"),
-                    )
-                else:
-                    me.text(
-                        "Budget Exceeded",
-                        type="headline-4",
-                        style=me.Style(color=me.theme_var("error"), font_family="Google Sans"),
-                    )
-        with me.box(style=me.Style(display="flex", justify_content="center", margin=me.Margin(top=12))):
-            if budget_missing:
-                me.text(
-                    (
-                        "Access is blocked because no budget is set for the project. "
-                        "Please contact an admin to set a budget."
-                    ) if cfg.BUDGET_SCOPE == "project" else (
-                        "Access is blocked because no budget is set for your department. "
-                        "Please contact an admin to set a budget."
-                    ),
-                    type="body-1",
-                    style=me.Style(color=me.theme_var("error")),
-                )
-            else:
-                me.text(
-                    (
-                        "Access is temporarily blocked because monthly costs exceed the project’s budget."
-                    ) if cfg.BUDGET_SCOPE == "project" else (
-                        "Access is temporarily blocked because monthly costs exceed your department’s budget."
-                    ),
-                    type="body-1",
-                    style=me.Style(color=me.theme_var("error")),
-                )
-        with me.box(style=me.Style(display="flex", justify_content="center", margin=me.Margin(top=24))):
-            with me.box(
-                style=me.Style(
-                    background=me.theme_var("surface"),
-                    border_radius=16,
-                    box_shadow=me.theme_var("shadow_elevation_2"),
-                    padding=me.Padding.all(24),
-                    width="min(720px, 100%)",
-                    display="flex",
-                    flex_direction="column",
-                    gap=16,
-                )
-            ):
+        with me.box(style=_CENTERED_SECTION_STYLE):
+            with me.box(style=_TITLE_ROW_STYLE):
+                me.text("⚠", type="headline-4", style=_ERROR_TEXT_STYLE)
+                me.text(title, type="headline-4", style=_ERROR_HEADLINE_STYLE)
+        with me.box(style=_MESSAGE_ROW_STYLE):
+            me.text(message, type="body-1", style=_ERROR_TEXT_STYLE)
+        with me.box(style=_CENTERED_SECTION_STYLE):
+            with me.box(style=_CARD_STYLE):
                 # Simple 4-row table: label left, value right (use dividers between rows)
-                def _row(label: str, value: str):
-                    with me.box(
-                        style=me.Style(
-                            display="flex",
-                            justify_content="space-between",
-                            align_items="center",
-                            padding=me.Padding(top=8, bottom=8),
-                        )
-                    ):
-                        me.text(label, type="subtitle-2", style=me.Style(color=me.theme_var("error")))
-                        me.text(value, type="body-1", style=me.Style(color=me.theme_var("error")))
-                dept_label = st.selected_department or dept or ("Project" if cfg.BUDGET_SCOPE == "project" else "—")
-                cost_label = (
-                    f"€{st.current_cost:,.2f}" if st.current_cost is not None else "Unavailable"
-                )
-                budget_label = (
-                    f"€{st.current_budget:,.2f}" if st.current_budget is not None else "Not set"
-                )
-                _row("User email", app.user_email)
-                me.divider()
-                if cfg.BUDGET_SCOPE == "project":
-                    _row("Scope", "Project")
-                    me.divider()
-                else:
-                    _row("Department", dept_label)
-                    me.divider()
-                _row("Current monthly cost", cost_label)
-                me.divider()
-                _row("Budget", budget_label)
-                with me.box(style=me.Style(display="flex", justify_content="flex-end", margin=me.Margin(top=8))):
+                for i, (label, value_of) in enumerate(_ROW_SPEC):
+                    if i:
+                        me.divider()
+                    _row(label, value_of(st, app))
+                with me.box(style=_ACTIONS_ROW_STYLE):
                     # Hide update button entirely in project mode per requirement
                     if role == "admin" and cfg.BUDGET_SCOPE != "project":
                         me.button(
                             "Update Budget",
                             on_click=_open_edit_dialog,
-                            style=me.Style(
-                                background=me.theme_var("primary"),
-                                color=me.theme_var("on-primary"),
-                                padding=me.Padding(top=10, bottom=10, left=16, right=16),
-                                border_radius=24,
-                                font_weight="600",
-                            ),
+                            style=_UPDATE_BUTTON_STYLE,
                         )
         if st.error_dialog_open:
             with dialog(is_open=st.error_dialog_open):  # pylint: disable=E1129:not-context-manager
-                me.text("Error", type="headline-6", style=me.Style(color=me.theme_var("error"), font_family="Google Sans"))
-                me.text(st.error_message, style=me.Style(margin=me.Margin(top=12)))
+                me.text("Error", type="headline-6", style=_ERROR_HEADLINE_STYLE)
+                me.text(st.error_message, style=_DIALOG_MESSAGE_STYLE)
                 with dialog_actions():  # pylint: disable=E1129:not-context-manager
                     me.button("Close", on_click=_close_error_dialog, type="flat")
     # Update Budget modal (disabled in project scope)
-    if st.edit_dialog_open and Default().BUDGET_SCOPE != "project":
+    if st.edit_dialog_open and cfg.BUDGET_SCOPE != "project":
             with dialog(is_open=st.edit_dialog_open):  # pylint: disable=E1129:not-context-manager
-                me.text("Update Budget", type="headline-6", style=me.Style(font_family="Google Sans"))
-                with me.box(style=me.Style(display="flex", flex_direction="column", gap=12, margin=me.Margin(top=12))):
-                    me.text("Department", type="subtitle-2", style=me.Style(color=me.theme_var("on-tertiary-container")))
+                me.text("Update Budget", type="headline-6", style=_DIALOG_TITLE_STYLE)
+                with me.box(style=_DIALOG_FORM_STYLE):
+                    me.text("Department", type="subtitle-2", style=_FIELD_LABEL_STYLE)
                     me.text(st.selected_department or dept or "—")
-                    me.text("New monthly budget (EUR)", type="subtitle-2", style=me.Style(color=me.theme_var("on-tertiary-container")))
+                    me.text("New monthly budget (EUR)", type="subtitle-2", style=_FIELD_LABEL_STYLE)
                     me.textarea(
                         label="Enter amount",
                         value=st.new_budget_input,
                         rows=1,
                         on_blur=on_budget_input,
-                        style=me.Style(width="320px"),
+                        style=_AMOUNT_INPUT_STYLE,
                     )
                 with dialog_actions():  # pylint: disable=E1129:not-context-manager
                     me.button("Cancel", on_click=_close_edit_dialog)
@@ -21,6 +21,7 @@ from typing import TYPE_CHECKING, Any
 import mesop as me
 from absl import logging
 from components.header import header
+from config import gcp_clients
 from config.default import Default
 from components import constants
 from state.state import AppState
@@ -28,7 +29,6 @@ from models import image_models
 from common import utils as helpers
 
 from common.storage import store_to_gcs
-from google.cloud import storage
 from components.page_scaffold import page_frame, page_scaffold
 
 if TYPE_CHECKING:
@@ -292,8 +292,7 @@ async def on_click_image_edit(event: me.ClickEvent) -> AsyncGenerator[Any, Any,
     state.edit_uri = ""
     yield
 
-    storage_client = storage.Client(project=config.PROJECT_ID)
-    bucket = storage_client.bucket(config.GENMEDIA_BUCKET)
+    bucket = gcp_clients.STORAGE.bucket(config.GENMEDIA_BUCKET)
     blob = bucket.blob(state.upload_uri.replace(f"gs://{config.GENMEDIA_BUCKET}/", ""))
     image_bytes = blob.download_as_bytes()
 
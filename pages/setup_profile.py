@@ -16,6 +16,43 @@ from config.default import Default
 from state.state import AppState
 from components.styles import PAGE_BACKGROUND_STYLE
 
+cfg = Default()
+# Departments come from env var for quick client-specific changes; parsed once at import
+_DEPARTMENTS = tuple(d.strip() for d in (cfg.BUDGET_DEPARTMENTS or "").split(",") if d.strip())
+_DEPT_OPTIONS = [me.SelectOption(label=k, value=k) for k in _DEPARTMENTS]
+_ROLE_OPTIONS = [
+    me.SelectOption(label="User", value="user"),
+    me.SelectOption(label="Admin", value="admin"),
+]
+
+# Styles (and the theme_var lookups inside them) are built once, not on every render.
+_CENTERED_SECTION_STYLE = me.Style(display="flex", justify_content="center", margin=me.Margin(top=24))
+_CONTAINER_STYLE = me.Style(width="min(720px, 100%)", display="flex", flex_direction="column", gap=16)
+_CARD_STYLE = me.Style(
+    background=me.theme_var("surface"),
+    border_radius=16,
+    box_shadow=me.theme_var("shadow_elevation_2"),
+    padding=me.Padding.all(24),
+    width="100%",
+    display="flex",
+    flex_direction="column",
+    gap=16,
+)
+_TITLE_STYLE = me.Style(font_family="Google Sans")
+_FIELD_STYLE = me.Style(display="flex", flex_direction="column", gap=6)
+_FIELD_LABEL_STYLE = me.Style(color=me.theme_var("on-tertiary-container"))
+_SELECT_STYLE = me.Style(width="320px")
+_ACTIONS_ROW_STYLE = me.Style(display="flex", gap=12, margin=me.Margin(top=8))
+_SAVE_BUTTON_STYLE = me.Style(
+    background=me.theme_var("primary"),
+    color=me.theme_var("on-primary"),
+    padding=me.Padding(top=10, bottom=10, left=16, right=16),
+    border_radius=24,
+    font_weight="600",
+)
+_ERROR_TITLE_STYLE = me.Style(color=me.theme_var("error"))
+_DIALOG_MESSAGE_STYLE = me.Style(margin=me.Margin(top=12))
+
 @me.stateclass
 class PageState:
     selected_department: str | None = None
@@ -48,7 +85,6 @@ def on_click_save(e: me.ClickEvent):  # pylint: disable=unused-argument
             me.navigate("/welcome")
         yield
     except PermissionDenied as ex:
-        cfg = Default()
         st.error_message = (
             "Failed to save department: 403 Missing or insufficient permissions.\n\n"
             "What to do:\n"
@@ -68,86 +104,65 @@ def setup_profile_content():
     app = me.state(AppState)
     st = me.state(PageState)
 
-    # Load departments dynamically on first render
-    # Departments come from env var for quick client-specific changes
-    cfg = Default()
-    departments = [d.strip() for d in (cfg.BUDGET_DEPARTMENTS or "").split(",") if d.strip()]
-
     with page_frame():  # pylint: disable=E1129:not-context-manager
         # Unified centered container for heading and form to ensure alignment
-        with me.box(style=me.Style(display="flex", justify_content="center", margin=me.Margin(top=24))):
-            with me.box(style=me.Style(width="min(720px, 100%)", display="flex", flex_direction="column", gap=16)):
+        with me.box(style=_CENTERED_SECTION_STYLE):
+            with me.box(style=_CONTAINER_STYLE):
 
                 # Form card fills container width
-                with me.box(
-                    style=me.Style(
-                        background=me.theme_var("surface"),
-                        border_radius=16,
-                        box_shadow=me.theme_var("shadow_elevation_2"),
-                        padding=me.Padding.all(24),
-                        width="100%",
-                        display="flex",
-                        flex_direction="column",
-                        gap=16,
-                    )
-                ):
-                    me.text("Complete your profile", type="headline-4", style=me.Style(font_family="Google Sans"))
-
-                    with me.box(style=me.Style(display="flex", flex_direction="column", gap=6)):
-                        me.text("Email", type="subtitle-2", style=me.Style(color=me.theme_var("on-tertiary-container")))
+                with me.box(style=_CARD_STYLE):
+                    me.text("Complete your profile", type="headline-4", style=_TITLE_STYLE)
+
+                    with me.box(style=_FIELD_STYLE):
+                        me.text("Email", type="subtitle-2", style=_FIELD_LABEL_STYLE)
                         me.text(app.user_email, type="body-1")
 
-                    with me.box(style=me.Style(display="flex", flex_direction="column", gap=6)):
-                        me.text("Department", type="subtitle-2", style=me.Style(color=me.theme_var("on-tertiary-container")))
+                    with me.box(style=_FIELD_STYLE):
+                        me.text("Department", type="subtitle-2", style=_FIELD_LABEL_STYLE)
                         me.select(
                             label="Select department",
-                            options=[me.SelectOption(label=k, value=k) for k in departments],
+                            options=_DEPT_OPTIONS,
                             value=st.selected_department or "",
                             on_selection_change=_on_dept_change,
-                            style=me.Style(width="320px"),
+                            style=_SELECT_STYLE,
                         )
 
-                    with me.box(style=me.Style(display="flex", flex_direction="column", gap=6)):
-                        me.text("Project Role", type="subtitle-2", style=me.Style(color=me.theme_var("on-tertiary-container")))
+                    with me.box(style=_FIELD_STYLE):
+                        me.text("Project Role", type="subtitle-2", style=_FIELD_LABEL_STYLE)
                         me.select(
                             label="Select role",
-                            options=[
-                                me.SelectOption(label="User", value="user"),
-                                me.SelectOption(label="Admin", value="admin"),
-                            ],
+                            options=_ROLE_OPTIONS,
                             value=st.selected_role or "",
                             on_selection_change=_on_role_change,
-                            style=me.Style(width="320px"),
+                            style=_SELECT_STYLE,
                         )
 
-                    with me.box(style=me.Style(display="flex", gap=12, margin=me.Margin(top=8))):
+                    with me.box(style=_ACTIONS_ROW_STYLE):
                         me.button(
                             "Save",
                             on_click=on_click_save,
-                            style=me.Style(
-                                background=me.theme_var("primary"),
-                                color=me.theme_var("on-primary"),
-                                padding=me.Padding(top=10, bottom=10, left=16, right=16),
-                                border_radius=24,
-                                font_weight="600",
-                            ),
+                            style=_SAVE_BUTTON_STYLE,
                         )
                         # No cancel/back: setup is required before accessing other pages
 
         if st.error_dialog_open:
             with dialog(is_open=st.error_dialog_open):  # pylint: disable=E1129:not-context-manager
-                me.text("Error", type="headline-6", style=me.Style(color=me.theme_var("error")))
-                me.text(st.error_message, style=me.Style(margin=me.Margin(top=12)))
+                me.text("Error", type="headline-6", style=_ERROR_TITLE_STYLE)
+                me.text(st.error_message, style=_DIALOG_MESSAGE_STYLE)
                 with dialog_actions():  # pylint: disable=E1129:not-context-manager
                     me.button("Close", on_click=_close_error_dialog, type="flat")
 
 def _on_dept_change(e: me.SelectSelectionChangeEvent):
     st = me.state(PageState)
+    if e.value == st.selected_department:
+        return
     st.selected_department = e.value
     yield
 
 def _on_role_change(e: me.SelectSelectionChangeEvent):
     st = me.state(PageState)
+    if e.value == st.selected_role:
+        return
     st.selected_role = e.value
     yield
 
@@ -0,0 +1,41 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import os
+import sys
+from unittest import mock
+
+import pytest
+from google.auth.credentials import AnonymousCredentials
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import without ADC and without the budget client warm-up thread.
+os.environ.setdefault("BUDGET_CHECK_ENABLED", "false")
+with mock.patch("google.auth.default", return_value=(AnonymousCredentials(), "test-project")):
+    from pages import access_restricted
+
+
+@pytest.mark.parametrize("value", ["0", "1500", "1500.50", "007", "12.0"])
+def test_num_re_accepts_plain_decimal_amounts(value):
+    assert access_restricted._NUM_RE.match(value)
+
+
+@pytest.mark.parametrize("value", [
+    "", " ", "-5", "+5", "1,500", "1e3", "1.", ".5", "1.2.3", "€100", "12abc", "nan", "1500\n",
+])
+def test_num_re_rejects_anything_else(value):
+    assert not access_restricted._NUM_RE.match(value)
@@ -0,0 +1,233 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import asyncio
+import datetime
+import os
+import sys
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from google.api_core.exceptions import NotFound, RetryError, ServiceUnavailable
+from google.auth.credentials import AnonymousCredentials
+from google.auth.exceptions import RefreshError
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import without ADC and without the budget client warm-up thread.
+os.environ.setdefault("BUDGET_CHECK_ENABLED", "false")
+with mock.patch("google.auth.default", return_value=(AnonymousCredentials(), "test-project")):
+    from models import budget
+
+
+def _doc(doc_id, data=None):
+    return SimpleNamespace(id=doc_id, exists=data is not None, to_dict=lambda: data)
+
+
+def _change(kind, doc):
+    return SimpleNamespace(type=SimpleNamespace(name=kind), document=doc)
+
+
+@pytest.fixture(autouse=True)
+def clean_state(monkeypatch):
+    monkeypatch.setattr(budget, "_SNAPSHOT", {
+        "user_departments": {},
+        "user_roles": {},
+        "department_budgets": {},
+        "monthly_cost": None,
+        "monthly_cost_at": None,
+        "users_live": False,
+        "budgets_live": False,
+    })
+    monkeypatch.setattr(budget, "_LISTENERS", {})
+    monkeypatch.setattr(budget, "_TRANSIENT_RETRY_DELAY_SECONDS", 0)
+    budget._USER_DEPT_CACHE.clear()
+    budget._LAST_KNOWN_DEPT.clear()
+    budget._DEPT_BUDGET_CACHE.clear()
+
+
+def test_read_or_none_returns_value():
+    assert budget._read_or_none(lambda x: x * 2, 21) == 42
+
+
+@pytest.mark.parametrize("error", [
+    NotFound("missing"),
+    RetryError("gave up", cause=None),
+    RefreshError("expired"),
+])
+def test_read_or_none_maps_api_retry_and_auth_errors_to_none(error):
+    read = mock.Mock(side_effect=error)
+    assert budget._read_or_none(read) is None
+    assert read.call_count == 1
+
+
+def test_read_or_none_retries_transient_error_once():
+    read = mock.Mock(side_effect=[ServiceUnavailable("blip"), "ok"])
+    assert budget._read_or_none(read) == "ok"
+    assert read.call_count == 2
+
+
+def test_read_or_none_gives_up_after_second_transient_error():
+    read = mock.Mock(side_effect=ServiceUnavailable("down"))
+    assert budget._read_or_none(read) is None
+    assert read.call_count == 2
+
+
+def test_read_or_none_propagates_unexpected_errors():
+    with pytest.raises(ValueError):
+        budget._read_or_none(mock.Mock(side_effect=ValueError("bug")))
+
+
+def test_users_snapshot_applies_changes_and_goes_live():
+    budget._SNAPSHOT["user_departments"]["gone@example.com"] = "Sales"
+    budget._on_users_snapshot(None, [
+        _change("ADDED", _doc("a@example.com", {"department": "Marketing", "Project_Role": " Admin "})),
+        _change("MODIFIED", _doc("b@example.com", {"department": "Sales", "role": "user"})),
+        _change("REMOVED", _doc("gone@example.com", {"department": "Sales"})),
+    ], None)
+    assert budget._SNAPSHOT["user_departments"] == {"a@example.com": "Marketing", "b@example.com": "Sales"}
+    assert budget._SNAPSHOT["user_roles"] == {"a@example.com": "admin", "b@example.com": "user"}
+    assert budget._SNAPSHOT["users_live"] is True
+
+
+def test_budgets_snapshot_applies_changes_and_goes_live():
+    budget._SNAPSHOT["department_budgets"]["Old"] = 10.0
+    budget._on_budgets_snapshot(None, [
+        _change("ADDED", _doc("Sales", {"amount": 1500})),
+        _change("MODIFIED", _doc("Ops", {"amount": "not a number"})),
+        _change("REMOVED", _doc("Old", {"amount": 10})),
+    ], None)
+    assert budget._SNAPSHOT["department_budgets"] == {"Sales": 1500.0, "Ops": None}
+    assert budget._SNAPSHOT["budgets_live"] is True
+
+
+def test_inactive_watch_falls_back_to_polling():
+    budget._SNAPSHOT["users_live"] = True
+    budget._SNAPSHOT["budgets_live"] = True
+    budget._LISTENERS["users_live"] = SimpleNamespace(is_active=False)
+    budget._LISTENERS["budgets_live"] = SimpleNamespace(is_active=True)
+    budget._expire_dead_listeners()
+    assert budget._SNAPSHOT["users_live"] is False
+    assert budget._SNAPSHOT["budgets_live"] is True
+    assert list(budget._LISTENERS) == ["budgets_live"]
+
+
+def test_missing_department_is_not_cached():
+    budget._cache_department("new@example.com", None)
+    assert "new@example.com" not in budget._USER_DEPT_CACHE
+    budget._cache_department("new@example.com", "Sales")
+    assert budget._USER_DEPT_CACHE["new@example.com"] == "Sales"
+    assert budget._LAST_KNOWN_DEPT["new@example.com"] == "Sales"
+
+
+@pytest.fixture
+def billing_export(monkeypatch):
+    monkeypatch.setattr(budget.cfg, "BILLING_DATASET", "billing")
+    monkeypatch.setattr(budget.cfg, "BILLING_TABLE", "export")
+    monkeypatch.setattr(budget.cfg, "PROJECT_ID", "cost-test-project")
+    monkeypatch.setattr(budget, "_COST_CACHE", {})
+
+
+def test_expired_cost_is_refreshed_by_one_caller(monkeypatch, billing_export):
+    import threading
+
+
+    def slow_query(*args):
+        time.sleep(0.1)
+        return 12.5
+
+    query = mock.Mock(side_effect=slow_query)
+    monkeypatch.setattr(budget, "_query_monthly_cloud_cost", query)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(budget.get_monthly_cloud_cost()))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == [12.5] * 5
+    assert query.call_count == 1
+
+
+def test_cost_job_config_omits_unset_byte_cap(monkeypatch):
+    monkeypatch.setattr(budget.cfg, "BILLING_MAX_BYTES_BILLED", None)
+    assert "maximumBytesBilled" not in budget._cost_job_config([]).to_api_repr()["query"]
+
+
+def test_cost_job_config_sets_configured_byte_cap(monkeypatch):
+    monkeypatch.setattr(budget.cfg, "BILLING_MAX_BYTES_BILLED", 10**9)
+    assert budget._cost_job_config([]).to_api_repr()["query"]["maximumBytesBilled"] == str(10**9)
+
+
+def _async_db(data):
+    """Fake async Firestore client whose documents all hold `data`."""
+    ref = SimpleNamespace(get=mock.AsyncMock(return_value=_doc("doc", data)))
+    db = mock.Mock()
+    db.collection.return_value.document.return_value = ref
+    return db, ref
+
+
+def test_live_snapshot_miss_reads_user_department(monkeypatch):
+    budget._SNAPSHOT["users_live"] = True
+    db, ref = _async_db({"department": "Sales"})
+    monkeypatch.setattr(budget, "_budget_async_db", lambda: db)
+    assert asyncio.run(budget.snapshot_user_department("new@example.com")) == "Sales"
+    assert ref.get.await_count == 1
+    assert budget._SNAPSHOT["user_departments"]["new@example.com"] == "Sales"
+
+
+def test_live_snapshot_miss_reads_department_budget(monkeypatch):
+    budget._SNAPSHOT["budgets_live"] = True
+    budget._DEPT_BUDGET_CACHE["Sales"] = None
+    db, ref = _async_db({"amount": 250})
+    monkeypatch.setattr(budget, "_budget_async_db", lambda: db)
+    assert asyncio.run(budget.snapshot_department_budget("Sales")) == 250.0
+    assert ref.get.await_count == 1
+    assert budget._SNAPSHOT["department_budgets"]["Sales"] == 250.0
+
+
+def test_snapshot_cost_is_used_while_fresh():
+    budget._SNAPSHOT["monthly_cost"] = 12.5
+    budget._SNAPSHOT["monthly_cost_at"] = time.time()
+    assert budget._snapshot_cost() == 12.5
+
+
+def test_snapshot_cost_expires_after_max_age():
+    budget._SNAPSHOT["monthly_cost"] = 12.5
+    budget._SNAPSHOT["monthly_cost_at"] = time.time() - budget._SNAPSHOT_COST_MAX_AGE_SECONDS - 1
+    assert budget._snapshot_cost() is None
+
+
+def test_snapshot_cost_from_previous_month_is_missing(monkeypatch):
+    monkeypatch.setattr(budget, "_SNAPSHOT_COST_MAX_AGE_SECONDS", float("inf"))
+    last_month = datetime.date.today().replace(day=1) - datetime.timedelta(days=1)
+    budget._SNAPSHOT["monthly_cost"] = 12.5
+    budget._SNAPSHOT["monthly_cost_at"] = time.mktime(last_month.timetuple())
+    assert budget._snapshot_cost() is None
+
+
+def test_failed_cost_query_is_cached_briefly(monkeypatch, billing_export):
+    query = mock.Mock(return_value=None)
+    monkeypatch.setattr(budget, "_query_monthly_cloud_cost", query)
+    assert budget.get_monthly_cloud_cost() is None
+    assert budget.get_monthly_cloud_cost() is None
+    assert query.call_count == 1
+    expires_at = budget._COST_CACHE["cost-test-project"][1]
+    assert expires_at <= time.monotonic() + budget._COST_FAILURE_TTL_SECONDS
@@ -0,0 +1,87 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import os
+import sys
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from common.request_paths import (
+    ASSET_EXTS,
+    PUBLIC_PREFIXES,
+    STATIC_PREFIXES,
+    is_bypass_path,
+    is_static_path,
+)
+
+
+def _loop_match(path, prefixes):
+    """The per-request loop the regexes replaced."""
+    is_public_prefix = any(path.startswith(p) for p in prefixes)
+    is_asset_request = any(path.lower().endswith("." + ext) for ext in ASSET_EXTS)
+    return is_public_prefix or is_asset_request
+
+
+PATHS = [
+    "/",
+    "/home",
+    "/veo",
+    "/favicon.ico",
+    "/assets/logo.png",
+    "/static/app.js",
+    "/__ui__",
+    "/__web-components-module__/components/x.js",
+    "/.well-known/appspecific/com.chrome.devtools.json",
+    "/api/get_signed_url",
+    "/api",
+    "/auth/callback",
+    "/setup_profile",
+    "/access_restricted",
+    "/media/bucket/video.MP4",
+    "/x.json",
+    "/x.json\n",
+    "/x.JSON",
+    "/x.jsonp",
+    "/xjson",
+    "/x.woff2",
+    "/x.cſs",  # long s folds to "s" only under Unicode case folding
+    "/page.js/",
+    "/library\n",
+    "/ASSETS/logo",
+]
+
+
+@pytest.mark.parametrize("path", PATHS)
+def test_bypass_matches_prefix_and_extension_loop(path):
+    assert is_bypass_path(path) == _loop_match(path, PUBLIC_PREFIXES)
+
+
+@pytest.mark.parametrize("path", PATHS)
+def test_static_matches_prefix_and_extension_loop(path):
+    assert is_static_path(path) == _loop_match(path, STATIC_PREFIXES)
+
+
+def test_trailing_newline_is_not_an_asset():
+    assert not is_bypass_path("/x.json\n")
+    assert not is_static_path("/veo.css\n")
+
+
+def test_mesop_routes_bypass_guard_but_are_not_static():
+    for path in ("/__ui__", "/api/convert_to_gif", "/setup_profile", "/access_restricted"):
+        assert is_bypass_path(path)
+        assert not is_static_path(path)